@@ -5,32 +5,212 @@ Author: Naja
 Version: 2.0
 """
 
-import asyncio
+from __future__ import annotations
+
+import abc
 import argparse
+import asyncio
+import bisect
+import contextlib
+import csv
+import hashlib
+import heapq
+import importlib.util
+import io
+import json
+import math
+import multiprocessing
 import os
+import queue
+import random
+import re
+import secrets
+import socket
+import sqlite3
 import sys
+import threading
 import time
-from typing import List, Dict, Optional, Set, Tuple
-from dataclasses import dataclass
-from functools import lru_cache
+from collections import Counter, OrderedDict, deque
+from email import utils as email_utils
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+from dataclasses import dataclass, field, replace
+from functools import cached_property, lru_cache
 from pathlib import Path
+from urllib.parse import urlsplit
 
-import aiohttp
-import tldextract
-import validators
+import multidict
 from colorama import init, Fore, Style
-from pyfiglet import Figlet
 
-# Initialize colorama
-init()
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# aiohttp, httpx (only for --engine http2), tldextract and validators take
+# longer to import than the rest of the tool together, so the code that needs
+# them imports them locally
+if TYPE_CHECKING:
+    import aiohttp
+    import httpx
+    import tldextract
+    from aiohttp import web
+
+def process_start_time() -> float:
+    """Wall-clock time this process started, so startup time includes interpreter boot
+    
+    Read from /proc where it exists; elsewhere, the time this module finished its imports.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields are counted after the command name, which may contain spaces
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time()
+
+STARTED_AT = process_start_time()
+
+@lru_cache(maxsize=None)
+def enable_colors():
+    """Initialize colorama the first time anything is rendered"""
+    init()
 
 class Config:
     """Configuration settings for the application"""
     TIMEOUT = 10
     MAX_RETRIES = 3
-    CHUNK_SIZE = 1024
+    CHUNK_SIZE = 8192
+    MAX_BODY_BYTES = 65536
+    
+    # Response classification
+    CONTROL_PATHS = 2
+    SIMHASH_MAX_TOKENS = 256
+    SIMHASH_DISTANCE = 10
+    VOLATILE_HEADERS = frozenset({
+        "date", "content-length", "transfer-encoding", "etag", "last-modified",
+        "age", "expires", "connection", "keep-alive"
+    })
+    
+    # Result output
+    OUTPUT_FORMATS = ["txt", "jsonl", "csv"]
+    SINK_BATCH_SIZE = 200
+    SINK_FLUSH_INTERVAL = 2.0
+    
+    # Terminal rendering
+    FRAME_RATE = 10
+    
+    # Multi-process mode: display events are batched from workers to the parent
+    CHANNEL_BATCH_SIZE = 200
+    CHANNEL_FLUSH_INTERVAL = 0.1
+    
+    # Resumable scans: by default each scan gets its own store in the working
+    # directory, named after a hash of its targets, directories and request options
+    CHECKPOINT_FILE = ".403bypass-{digest}.checkpoint"
+    CHECKPOINT_BATCH_SIZE = 1000
     LINE_WIDTH = 100
     
+    # Startup: local cache for the rendered banner, optional public suffix list file
+    # (the snapshot bundled with tldextract is used when no file is given)
+    CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "403bypass"
+    BANNER_FONT = "slant"
+    SUFFIX_LIST: Optional[str] = None
+    
+    # Technique history (opt-in): tries and non-baseline hits per server fingerprint,
+    # kept across runs to send the RANKED_PREFIX most promising mutations first
+    # (--fast sends only the top FAST_BUDGET). Hit rates are smoothed towards
+    # those of all servers with HISTORY_PRIOR_WEIGHT pseudo-tries.
+    HISTORY_FILE = CACHE_DIR / "history.db"
+    HISTORY_PRIOR_WEIGHT = 20
+    RANKED_PREFIX = 100
+    FAST_BUDGET = 100
+    # Response headers that give away the CDN or WAF in front of a server
+    CDN_HEADERS = {
+        "cf-ray": "cloudflare",
+        "x-amz-cf-id": "cloudfront",
+        "akamai-grn": "akamai",
+        "x-akamai-transformed": "akamai",
+        "x-fastly-request-id": "fastly",
+        "x-azure-ref": "azure",
+        "x-sucuri-id": "sucuri",
+        "x-iinfo": "imperva",
+        "x-cdn": "imperva"
+    }
+    
+    # Scheduling limits. Rate buckets and pre-flight verdicts are kept for the
+    # HOST_STATE_LIMIT most recently used hosts, so memory does not grow with the list
+    PER_HOST_LIMIT = 10
+    HOST_STATE_LIMIT = 1024
+    
+    # Adaptive per-host rate control (requests per second). Hosts are not capped
+    # until they throttle or slow down, unless --rate or --max-rate says otherwise
+    MIN_RATE = 0.5
+    RATE_INCREASE = 1.0
+    RATE_DECREASE = 0.5
+    RATE_DECREASE_COOLDOWN = 1.0
+    LATENCY_WINDOW = 50
+    LATENCY_FACTOR = 4.0
+    LATENCY_FLOOR = 0.25
+    THROTTLE_STATUSES = (429, 503)
+    
+    # Retries
+    RETRY_STATUSES = (429, 502, 503, 504)
+    BACKOFF_BASE = 0.5
+    MAX_BACKOFF = 30.0
+    MAX_RETRY_AFTER = 120.0
+    
+    # Mutation cache shared by every target with the same base path
+    MUTATION_CACHE_BYTES = 64 * 1024 * 1024
+    
+    # Pre-flight: only paths answering with these statuses get the full mutation set
+    GATE_STATUSES = (401, 403)
+    PREFLIGHT_TIMEOUT = 5
+    
+    # Target input: URLs are streamed, deduplicated with a scalable Bloom filter
+    # (sized for BLOOM_CAPACITY URLs, then grown) and handed on in batches
+    BLOOM_CAPACITY = 100_000
+    BLOOM_ERROR_RATE = 1e-6
+    # Request lines already queued are kept per host in a Bloom filter of the same
+    # error rate (a false positive skips one mutation), starting at WIRE_LINES_CAPACITY
+    # lines; the filters of the last WIRE_LINES_IDLE_HOSTS idle hosts are kept
+    WIRE_LINES_CAPACITY = 4096
+    WIRE_LINES_IDLE_HOSTS = 16
+    INPUT_BUFFER = 10_000
+    URL_BATCH_SIZE = 500
+    # How often a blocked hand-off to a worker process checks that it is still alive
+    WORKER_POLL = 1.0
+    
+    # Distributed mode: a coordinator leases batches of requests to remote workers.
+    # Leases not renewed for LEASE_TIMEOUT seconds are handed to other workers;
+    # idle workers wait up to LEASE_POLL seconds for new work per request.
+    # The coordinator only listens on loopback unless --bind says otherwise.
+    COORDINATOR_HOST = "127.0.0.1"
+    LEASE_TIMEOUT = 30.0
+    LEASE_POLL = 10.0
+    
+    # Combination mode: attempts to find an untried combination before giving up
+    COMBO_MAX_ATTEMPTS = 50
+    
+    # Telemetry: latency histogram buckets (seconds), metrics endpoint, profiling
+    LATENCY_BUCKETS = (
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+    )
+    METRICS_HOST = "127.0.0.1"
+    METRICS_MAX_HOSTS = 50
+    METRICS_RATE_WINDOW = 10.0
+    PROFILE_TOP = 25
+    
+    # Connection pool settings
+    ENGINES = ["aiohttp", "raw", "http2"]
+    RAW_USER_AGENT = "Mozilla/5.0 (compatible; 403bypass)"
+    RAW_MAX_HEADERS = 256
+    POOL_LIMIT = 100
+    KEEPALIVE_TIMEOUT = 30
+    DNS_CACHE_TTL = 300
+    
     # HTTP Method override headers
     METHOD_HEADERS = [
         "X-HTTP-Method",
@@ -76,6 +256,122 @@ class Config:
         ".json", ".css", ".html", "?", "??", "???",
         "?testparam", "#", "#test", "/."
     ]
+    
+    # URL encodings substituted for each path character (no duplicates)
+    URL_ENCODINGS = (
+        "%20", "%2e", "%2f", "%3a", "%3b", "%3d", "%3f", "%40",
+        "%5c", "%7e", "%25", "%2d", "%2b", "%2a", "%23", "%26",
+        "%3c", "%3e", "%5b", "%5d", "%7b", "%7d", "%7c", "%5e",
+        "%60", "%27", "%22", "%24", "%2c"
+    )
+
+def simhash(weighted_hashes: Iterable[Tuple[int, int]]) -> int:
+    """Combine (64-bit token hash, count) pairs into a 64-bit simhash"""
+    weights = [0] * 64
+    for token_hash, count in weighted_hashes:
+        for bit in range(64):
+            weights[bit] += count if token_hash >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+@dataclass(frozen=True)
+class ResponseFingerprint:
+    """Cheap summary of a response used to cluster look-alike pages"""
+    status: int
+    length_bucket: int
+    body_hash: Optional[str]
+    header_names: frozenset
+    token_hashes: Tuple[Tuple[int, int], ...] = field(default=(), repr=False, compare=False)
+    server: str = field(default="", compare=False)
+    
+    @staticmethod
+    def bucket(length: int) -> int:
+        """Logarithmic length bucket, roughly 19% wide"""
+        return int(math.log2(length + 1) * 4)
+    
+    @cached_property
+    def simhash(self) -> Optional[int]:
+        # Only computed when two responses are otherwise too close to call
+        return simhash(self.token_hashes) if self.token_hashes else None
+    
+    def to_dict(self) -> Dict:
+        """JSON-safe form; only the simhash of the tokens travels, which is all `matches` needs"""
+        return {
+            "status": self.status,
+            "length_bucket": self.length_bucket,
+            "body_hash": self.body_hash,
+            "header_names": sorted(self.header_names),
+            "simhash": self.simhash,
+            "server": self.server
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ResponseFingerprint":
+        fingerprint = cls(
+            status=data["status"],
+            length_bucket=data["length_bucket"],
+            body_hash=data["body_hash"],
+            header_names=frozenset(data["header_names"]),
+            server=data["server"]
+        )
+        # Prime the cached property with the sender's simhash
+        fingerprint.__dict__["simhash"] = data["simhash"]
+        return fingerprint
+    
+    def matches(self, other: "ResponseFingerprint") -> bool:
+        """Whether both responses look like the same page"""
+        if self.status != other.status or self.header_names != other.header_names:
+            return False
+        if self.body_hash and self.body_hash == other.body_hash:
+            return True
+        if abs(self.length_bucket - other.length_bucket) > 1:
+            return False
+        if self.simhash is None or other.simhash is None:
+            return True
+        return bin(self.simhash ^ other.simhash).count("1") <= Config.SIMHASH_DISTANCE
+
+class FingerprintBuilder:
+    """Builds a ResponseFingerprint incrementally from streamed body chunks"""
+    
+    _TOKEN = re.compile(rb"[A-Za-z0-9_]+")
+    _PARTIAL = re.compile(rb"[A-Za-z0-9_]{0,64}\Z")
+    
+    def __init__(self):
+        self._digest = hashlib.blake2b(digest_size=16)
+        self._tokens: Counter = Counter()
+        self._tail = b""
+        self.size = 0
+    
+    def update(self, chunk: bytes):
+        """Feed the next body chunk"""
+        self.size += len(chunk)
+        self._digest.update(chunk)
+        if len(self._tokens) >= Config.SIMHASH_MAX_TOKENS:
+            return
+        data = self._tail + chunk
+        # Hold back a token cut in half by the chunk boundary
+        cut = self._PARTIAL.search(data).start()
+        self._tail = data[cut:]
+        self._tokens.update(self._TOKEN.findall(data, 0, cut))
+    
+    def finish(self, status: int, length: int, header_names: Iterable[str],
+               complete: bool = True, server: str = "") -> ResponseFingerprint:
+        """Freeze the fingerprint once the body has been read"""
+        if self._tail:
+            self._tokens[self._tail] += 1
+        token_hashes = tuple(
+            (int.from_bytes(hashlib.blake2b(token, digest_size=8).digest(), "big"), count)
+            for token, count in self._tokens.most_common(Config.SIMHASH_MAX_TOKENS)
+        )
+        return ResponseFingerprint(
+            status=status,
+            length_bucket=ResponseFingerprint.bucket(length),
+            body_hash=self._digest.hexdigest() if complete and self.size else None,
+            header_names=frozenset(
+                name.lower() for name in header_names
+            ) - Config.VOLATILE_HEADERS,
+            token_hashes=token_hashes,
+            server=server
+        )
 
 @dataclass
 class RequestResult:
@@ -84,23 +380,383 @@ class RequestResult:
     url: str
     status_code: int
     content_length: int
-    headers: Optional[Dict] = None
+    headers: Optional[Mapping[str, str]] = None
     error: Optional[str] = None
+    body_hash: Optional[str] = None
+    truncated: bool = False
+    fingerprint: Optional[ResponseFingerprint] = field(default=None, repr=False)
+    interesting: Optional[bool] = None
+    replayed: bool = False
+    elapsed: float = 0.0
+    
+    def to_dict(self) -> Dict:
+        """Plain dict of the result, without the fingerprint"""
+        return {
+            "method": self.method,
+            "url": self.url,
+            "status_code": self.status_code,
+            "content_length": self.content_length,
+            "headers": dict(self.headers) if self.headers else None,
+            "error": self.error,
+            "body_hash": self.body_hash,
+            "truncated": self.truncated,
+            "interesting": self.interesting,
+            "elapsed": self.elapsed
+        }
+    
+    def to_wire(self) -> Dict:
+        """Plain dict of the result with its fingerprint, as sent by remote workers"""
+        return dict(self.to_dict(), fingerprint=self.fingerprint.to_dict() if self.fingerprint else None)
+    
+    @classmethod
+    def from_wire(cls, data: Dict) -> "RequestResult":
+        fingerprint = data.get("fingerprint")
+        return cls(**dict(data, fingerprint=ResponseFingerprint.from_dict(fingerprint) if fingerprint else None))
+
+@lru_cache(maxsize=4096)
+def host_of(url: str) -> str:
+    """Return the host[:port] part of a URL"""
+    return urlsplit(url).netloc
+
+@lru_cache(maxsize=None)
+def domain_extractor() -> "tldextract.TLDExtract":
+    """tldextract reading the suffix list from a local file, never from the network
+    
+    Without --suffix-list it uses the snapshot bundled with the package. It
+    is built on first use, so only scans that write results pay for it.
+    """
+    import tldextract
+    if Config.SUFFIX_LIST:
+        return tldextract.TLDExtract(cache_dir=None, suffix_list_urls=(Path(Config.SUFFIX_LIST).resolve().as_uri(),),
+                                     fallback_to_snapshot=False)
+    return tldextract.TLDExtract(cache_dir=None, suffix_list_urls=())
+
+@lru_cache(maxsize=4096)
+def split_host(host: str) -> Tuple[str, str]:
+    """Return (domain, registered domain) of a host[:port], cached per host"""
+    if host.startswith("["):
+        return host[:host.index("]") + 1], ""
+    extracted = domain_extractor()(host.rsplit(":", 1)[0])
+    return extracted.domain, extracted.registered_domain
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(line: str) -> Optional[str]:
+    """Canonical form of one target line, or None when it is not an http(s) URL
+    
+    The scheme and host are lowercased, default ports, fragments and
+    trailing slashes are dropped, and bare hosts get an http:// scheme,
+    so spelling variants of one target dedup to the same string.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if "://" not in line:
+        line = "http://" + line
+    try:
+        parts = urlsplit(line)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    host = parts.hostname
+    if scheme not in DEFAULT_PORTS or not host or any(c.isspace() for c in line):
+        return None
+    if ":" in host:
+        host = f"[{host}]"
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    userinfo = parts.netloc.rpartition("@")[0]
+    if userinfo:
+        host = f"{userinfo}@{host}"
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{scheme}://{host}{parts.path.rstrip('/')}{query}"
+
+def next_prime(n: int) -> int:
+    """Smallest prime >= n (trial division, only used when sizing filters)"""
+    n = max(n, 2)
+    while any(n % d == 0 for d in range(2, math.isqrt(n) + 1)):
+        n += 1
+    return n
+
+class BloomFilter:
+    """Fixed-size Bloom filter over a bytearray, probed with double hashing
+    
+    The size is prime so no probe step can cycle over a few bits.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = next_prime(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    # Both probe with enhanced double hashing (Dillinger & Manolios): the growing
+    # step keeps the probe sequences of different items from overlapping as a whole
+    
+    def contains(self, h1: int, h2: int) -> bool:
+        bits, size = self.bits, self.size
+        bit, step = h1 % size, h2 % size
+        for i in range(self.hashes):
+            if not bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+            bit = (bit + step) % size
+            step = (step + i) % size
+        return True
+    
+    def insert(self, h1: int, h2: int):
+        bits, size = self.bits, self.size
+        bit, step = h1 % size, h2 % size
+        for i in range(self.hashes):
+            bits[bit >> 3] |= 1 << (bit & 7)
+            bit = (bit + step) % size
+            step = (step + i) % size
+        self.count += 1
+
+class ScalableBloomFilter:
+    """Approximate set of strings in a few bytes per item, grown as it fills
+    
+    Each full filter is followed by one twice as large with half the error
+    rate, so the false positive rate stays below `error_rate` however
+    many items arrive (Almeida et al., "Scalable Bloom Filters"). A false
+    positive only means a new item is taken for a duplicate.
+    """
+    
+    def __init__(self, capacity: int = Config.BLOOM_CAPACITY, error_rate: float = Config.BLOOM_ERROR_RATE):
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(capacity, error_rate / 2)]
+    
+    @staticmethod
+    def _hashes(item: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+    
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = self._hashes(item)
+        return any(bloom.contains(h1, h2) for bloom in self.filters)
+    
+    def add(self, item: str) -> bool:
+        """Add `item`, returning False if it was (probably) seen before"""
+        h1, h2 = self._hashes(item)
+        if any(bloom.contains(h1, h2) for bloom in self.filters):
+            return False
+        current = self.filters[-1]
+        if current.count >= current.capacity:
+            current = BloomFilter(current.capacity * 2, self.error_rate / 2 ** (len(self.filters) + 1))
+            self.filters.append(current)
+        current.insert(h1, h2)
+        return True
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(len(bloom.bits) for bloom in self.filters)
+
+class WireLines:
+    """Request lines already queued, per host, shared by every Scanner of a scan
+    
+    Lines are compared as the engine writes them, so directories that
+    normalize to the same path on the wire send each request only once.
+    A host's filter lives while one of its Scanners is generating
+    requests; a few idle ones are kept for Scanners that come later.
+    """
+    
+    def __init__(self, idle_hosts: int = Config.WIRE_LINES_IDLE_HOSTS):
+        self.idle_hosts = idle_hosts
+        self._active: Dict[str, ScalableBloomFilter] = {}
+        self._users: Counter = Counter()
+        self._idle: OrderedDict[str, ScalableBloomFilter] = OrderedDict()
+    
+    def acquire(self, host: str) -> ScalableBloomFilter:
+        """Filter of the lines queued for `host`, held until `release`"""
+        seen = self._active.get(host) or self._idle.pop(host, None) or ScalableBloomFilter(Config.WIRE_LINES_CAPACITY)
+        self._active[host] = seen
+        self._users[host] += 1
+        return seen
+    
+    def release(self, host: str):
+        self._users[host] -= 1
+        if not self._users[host]:
+            del self._users[host]
+            self._idle[host] = self._active.pop(host)
+            if len(self._idle) > self.idle_hosts:
+                self._idle.popitem(last=False)
+
+def read_lines(path: str) -> Iterator[str]:
+    """Lines of a file, or of stdin for "-", read lazily"""
+    if path == "-":
+        yield from sys.stdin
+        return
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from f
+
+class UrlStream:
+    """Target URLs normalized and deduplicated as they are read
+    
+    Iterating reads the source only as far as the consumer gets, so
+    multi-million line lists (or an endless pipe on stdin) never have to
+    fit in memory. The stream can only be iterated once.
+    """
+    
+    def __init__(self, lines: Iterable[str]):
+        self.lines = lines
+        self.read = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.seen = ScalableBloomFilter()
+    
+    @classmethod
+    def open(cls, path: str) -> "UrlStream":
+        return cls(read_lines(path))
+    
+    def __iter__(self) -> Iterator[str]:
+        for line in self.lines:
+            url = normalize_url(line)
+            if url is None:
+                if line.strip() and not line.lstrip().startswith("#"):
+                    self.invalid += 1
+                continue
+            self.read += 1
+            if not self.seen.add(url):
+                self.duplicates += 1
+                continue
+            yield url
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "urls_read": self.read, "duplicate_urls": self.duplicates,
+            "invalid_urls": self.invalid, "dedup_bytes": self.seen.nbytes
+        }
+
+class BackgroundIterator:
+    """Async iterator over a blocking iterable that is read ahead in a daemon thread
+    
+    The thread stops once `buffer_size` items are waiting, and only wakes
+    the event loop when the buffer goes from empty to non-empty, so slow
+    input (stdin, a worker queue) never blocks the scan and fast input
+    costs next to nothing per item.
+    """
+    
+    def __init__(self, iterable: Iterable, buffer_size: int = Config.INPUT_BUFFER):
+        self.iterable = iterable
+        self.buffer_size = buffer_size
+        self._buffer: deque = deque()
+        self._space = threading.Condition()
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+    
+    def _wake(self):
+        self._loop.call_soon_threadsafe(self._ready.set)
+    
+    def _pump(self):
+        try:
+            for item in self.iterable:
+                with self._space:
+                    while len(self._buffer) >= self.buffer_size:
+                        self._space.wait()
+                    wake = not self._buffer
+                    self._buffer.append(item)
+                if wake:
+                    self._wake()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done = True
+            with contextlib.suppress(RuntimeError):
+                self._wake()
+    
+    def __aiter__(self) -> AsyncIterator:
+        return self._iterate()
+    
+    async def _iterate(self) -> AsyncIterator:
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        threading.Thread(target=self._pump, daemon=True).start()
+        while True:
+            self._ready.clear()
+            # Read before draining: once done, the buffer holds everything left
+            done = self._done
+            with self._space:
+                items = list(self._buffer)
+                self._buffer.clear()
+                self._space.notify()
+            for item in items:
+                yield item
+            if not items:
+                if done:
+                    break
+                await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+@dataclass
+class WorkItem:
+    """A single request waiting to be dispatched"""
+    url: str
+    path: str
+    method: str = "GET"
+    headers: Optional[Mapping[str, str]] = None
+    phase: str = ""
+    techniques: Tuple[str, ...] = ()
+    scanner: Optional["Scanner"] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def target(self) -> str:
+        return f"{self.url}{self.path}"
+    
+    @property
+    def host(self) -> str:
+        return host_of(self.url)
+    
+    @property
+    def key(self) -> int:
+        """Stable 64-bit identity of the request, used by checkpoints"""
+        headers = "\0".join(f"{k}:{v}" for k, v in sorted(self.headers.items())) if self.headers else ""
+        digest = hashlib.blake2b(
+            f"{self.url}\0{self.path}\0{self.method}\0{headers}".encode(), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big", signed=True)
 
 class DisplayManager:
     """Manages the display of scan results and progress"""
     
     def __init__(self):
+        enable_colors()
         self.start_time = time.time()
+        self.startup_time: Optional[float] = None
         self.total_requests = 0
         self.completed_requests = 0
         self.successful_bypasses = 0
         self.failed_requests = 0
+        self.filtered_responses = 0
+        self.replayed_requests = 0
+        self.quiet = False
+    
+    def adjust_total(self, delta: int):
+        """Correct the expected number of requests once it is known exactly"""
+        self.total_requests += delta
+    
+    def _banner_text(self) -> str:
+        """Rendered banner art, loading pyfiglet only when it is not cached yet"""
+        cached = Config.CACHE_DIR / f"banner-{Config.BANNER_FONT}.txt"
+        try:
+            return cached.read_text(encoding="utf-8")
+        except OSError:
+            pass
+        from pyfiglet import Figlet
+        banner = Figlet(font=Config.BANNER_FONT).renderText('403 Bypass')
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            cached.write_text(banner, encoding="utf-8")
+        except OSError:
+            pass
+        return banner
     
     def print_banner(self):
         """Display the application banner"""
-        custom_fig = Figlet(font='slant')
-        banner = custom_fig.renderText('403 Bypass')
+        banner = self._banner_text()
         print(Fore.MAGENTA + Style.BRIGHT + banner + Style.RESET_ALL)
         
         # Print version and author info
@@ -131,14 +787,20 @@ class DisplayManager:
         print(f"\r{Fore.CYAN}[{bar}] {percent*100:.1f}% | {current}/{total} | "
               f"Elapsed: {elapsed:.1f}s | ETA: {eta:.1f}s{Style.RESET_ALL}", end="")
     
-    def print_result(self, result: RequestResult):
-        """Display request result"""
+    def print_result(self, result: RequestResult, interesting: bool = True):
+        """Display request result; responses matching the baseline are only counted"""
         if result.error:
-            print(f"\n{Fore.RED}✗ {result.error} for {result.url}{Style.RESET_ALL}")
+            if not self.quiet:
+                print(f"\n{Fore.RED}✗ {result.error} for {result.url}{Style.RESET_ALL}")
             self.failed_requests += 1
             return
         
         self.completed_requests += 1
+        if result.replayed:
+            self.replayed_requests += 1
+        if not interesting:
+            self.filtered_responses += 1
+            return
         
         # Get status emoji and color
         if result.status_code == 200:
@@ -171,10 +833,11 @@ class DisplayManager:
         size = f"{Fore.YELLOW}{result.content_length}{Style.RESET_ALL}"
         
         print(f"\n{emoji} {method} {url}")
-        print(f"   Status: {status} | Size: {size} bytes")
+        truncated = " (truncated)" if result.truncated else ""
+        print(f"   Status: {status} | Size: {size} bytes{truncated}")
         
         if result.headers:
-            print(f"   Headers: {result.headers}")
+            print(f"   Headers: {dict(result.headers)}")
     
     def print_summary(self):
         """Display scan summary"""
@@ -194,244 +857,2717 @@ class DisplayManager:
         print(Fore.CYAN + Style.BRIGHT + "║" + 
               f" Failed Requests: {self.failed_requests}".ljust(78) + 
               Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Filtered (same as baseline): {self.filtered_responses}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        if self.replayed_requests:
+            print(Fore.CYAN + Style.BRIGHT + "║" + 
+                  f" Replayed from checkpoint: {self.replayed_requests}".ljust(78) + 
+                  Fore.CYAN + Style.BRIGHT + "║")
         print(Fore.CYAN + Style.BRIGHT + "║" + 
               f" Success Rate: {success_rate:.1f}%".ljust(78) + 
               Fore.CYAN + Style.BRIGHT + "║")
         print(Fore.CYAN + Style.BRIGHT + "║" + 
               f" Time Elapsed: {elapsed:.1f} seconds".ljust(78) + 
               Fore.CYAN + Style.BRIGHT + "║")
+        if self.startup_time is not None:
+            print(Fore.CYAN + Style.BRIGHT + "║" + 
+                  f" Startup Time: {self.startup_time * 1000:.0f} ms".ljust(78) + 
+                  Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
+    
+    def print_pool_stats(self, created: int, reused: int, reuse_ratio: float,
+                         retries: int = 0, throttled: int = 0, http2: int = 0):
+        """Display connection pool and retry statistics"""
+        print("\n" + Fore.CYAN + Style.BRIGHT + "╔" + "═" * 78 + "╗")
+        print(Fore.CYAN + Style.BRIGHT + "║" + Fore.YELLOW + Style.BRIGHT + 
+              " Connection Pool".center(78) + Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╠" + "═" * 78 + "╣")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Connections Opened: {created}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Connections Reused: {reused}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Reuse Rate: {reuse_ratio * 100:.1f}%".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        if http2:
+            print(Fore.CYAN + Style.BRIGHT + "║" + 
+                  f" HTTP/2 Responses: {http2}".ljust(78) + 
+                  Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Retries: {retries} | Throttled: {throttled}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
         print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
 
-class RequestManager:
-    """Handles HTTP requests and response processing"""
+    def print_preflight(self, requests: int, dead_hosts: int, skipped: Dict[str, int]):
+        """Display what the pre-flight stage kept out of the full scan"""
+        print("\n" + Fore.CYAN + Style.BRIGHT + "╔" + "═" * 78 + "╗")
+        print(Fore.CYAN + Style.BRIGHT + "║" + Fore.YELLOW + Style.BRIGHT + 
+              " Pre-flight".center(78) + Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╠" + "═" * 78 + "╣")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Paths Probed: {requests} | Unreachable Hosts: {dead_hosts}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Paths Skipped: {sum(skipped.values())}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        for reason, count in sorted(skipped.items(), key=lambda entry: -entry[1]):
+            label = f"status {reason}" if reason.isdigit() else reason
+            print(Fore.CYAN + Style.BRIGHT + "║" + 
+                  f"   {label}: {count}".ljust(78) + 
+                  Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
     
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
-        self.results: List[str] = []
+    def print_targets(self, read: int, duplicates: int, invalid: int, dedup_bytes: int):
+        """Display what was dropped from the target list while it was read"""
+        print("\n" + Fore.CYAN + Style.BRIGHT + "╔" + "═" * 78 + "╗")
+        print(Fore.CYAN + Style.BRIGHT + "║" + Fore.YELLOW + Style.BRIGHT + 
+              " Targets".center(78) + Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╠" + "═" * 78 + "╣")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" URLs Read: {read} | Unique: {read - duplicates}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Duplicates Skipped: {duplicates} | Invalid Lines: {invalid}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Dedup Filter: {dedup_bytes / 1024:.0f} KiB".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
+    
+    def print_coordinator(self, host: str, port: int, token: str):
+        """Display how remote workers join this scan"""
+        print("\n" + Fore.CYAN + Style.BRIGHT + "╔" + "═" * 78 + "╗")
+        print(Fore.CYAN + Style.BRIGHT + "║" + Fore.YELLOW + Style.BRIGHT + 
+              " Coordinator".center(78) + Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╠" + "═" * 78 + "╣")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Listening on {host}:{port}, waiting for workers to join with:".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f"   --join http://<this host>:{port} --token {token}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
+    
+    def print_distributed(self, workers: int, leased: int, expired: int, reassigned: int):
+        """Display how the requests were spread over remote workers"""
+        print("\n" + Fore.CYAN + Style.BRIGHT + "╔" + "═" * 78 + "╗")
+        print(Fore.CYAN + Style.BRIGHT + "║" + Fore.YELLOW + Style.BRIGHT + 
+              " Distributed".center(78) + Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╠" + "═" * 78 + "╣")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Workers: {workers} | Requests Leased: {leased}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Expired Leases: {expired} | Requests Reassigned: {reassigned}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
+    
+    def print_remote_worker(self, worker: str, coordinator: str, completed: int, elapsed: float):
+        """Display what this worker did for a coordinator"""
+        print("\n" + Fore.CYAN + Style.BRIGHT + "╔" + "═" * 78 + "╗")
+        print(Fore.CYAN + Style.BRIGHT + "║" + Fore.YELLOW + Style.BRIGHT + 
+              " Remote Worker".center(78) + Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╠" + "═" * 78 + "╣")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Worker: {worker}"[:78].ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Coordinator: {coordinator}"[:78].ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" Requests Sent: {completed} | Time Elapsed: {elapsed:.1f} seconds".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
+    
+    def print_timings(self, timings: Dict[str, "LatencyHistogram"]):
+        """Display where request time went, stage by stage"""
+        print("\n" + Fore.CYAN + Style.BRIGHT + "╔" + "═" * 78 + "╗")
+        print(Fore.CYAN + Style.BRIGHT + "║" + Fore.YELLOW + Style.BRIGHT + 
+              " Request Timings (ms)".center(78) + Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╠" + "═" * 78 + "╣")
+        print(Fore.CYAN + Style.BRIGHT + "║" + 
+              f" {'Stage':<10}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}".ljust(78) + 
+              Fore.CYAN + Style.BRIGHT + "║")
+        for stage, histogram in timings.items():
+            mean = histogram.sum / histogram.count if histogram.count else 0.0
+            row = "".join(f"{value * 1000:>10.1f}" for value in (
+                histogram.quantile(0.5), histogram.quantile(0.95), histogram.quantile(0.99), mean
+            ))
+            print(Fore.CYAN + Style.BRIGHT + "║" + 
+                  f" {stage:<10}{row}".ljust(78) + 
+                  Fore.CYAN + Style.BRIGHT + "║")
+        print(Fore.CYAN + Style.BRIGHT + "╚" + "═" * 78 + "╝" + Style.RESET_ALL)
+
+class WorkerChannel:
+    """Batches display events from a worker process to the parent aggregator"""
+    
+    def __init__(self, events: "multiprocessing.Queue",
+                 batch_size: int = Config.CHANNEL_BATCH_SIZE,
+                 flush_interval: float = Config.CHANNEL_FLUSH_INTERVAL):
+        self.events = events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple] = []
+        self._task: Optional[asyncio.Task] = None
+    
+    def send(self, *event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            self.events.put(self._buffer)
+            self._buffer = []
+    
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self._task = asyncio.ensure_future(self._flush_periodically())
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        if self._task:
+            self._task.cancel()
+        self.flush()
+
+class ForwardingDisplay(DisplayManager):
+    """DisplayManager of one scanner that forwards events to a channel instead of printing
     
-    @staticmethod
-    @lru_cache(maxsize=128)
-    def get_status_color(status_code: int) -> str:
-        """Get color code for status code"""
-        if status_code in (200, 201):
-            return Fore.GREEN + Style.BRIGHT
-        elif status_code in (301, 302):
-            return Fore.BLUE + Style.BRIGHT
-        elif status_code in (403, 404):
-            return Fore.MAGENTA + Style.BRIGHT
-        elif status_code == 500:
-            return Fore.RED + Style.BRIGHT
-        return Fore.WHITE + Style.BRIGHT
+    The channel is either the in-process Renderer or, in a worker process,
+    the WorkerChannel back to the parent.
+    """
     
-    async def make_request(self, method: str, url: str, headers: Optional[Dict] = None) -> Optional[RequestResult]:
-        """Make HTTP request with retry logic"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
-        for attempt in range(Config.MAX_RETRIES):
-            try:
-                async with self.session.request(
-                    method, url, headers=headers, timeout=Config.TIMEOUT
-                ) as response:
-                    content = await response.read()
-                    return RequestResult(
-                        method=method,
-                        url=url,
-                        status_code=response.status,
-                        content_length=len(content),
-                        headers=headers
-                    )
-            except aiohttp.ClientError as e:
-                if attempt == Config.MAX_RETRIES - 1:
-                    return RequestResult(
-                        method=method,
-                        url=url,
-                        status_code=0,
-                        content_length=0,
-                        error=f"Connection Error: {str(e)}"
-                    )
-            except asyncio.TimeoutError:
-                if attempt == Config.MAX_RETRIES - 1:
-                    return RequestResult(
-                        method=method,
-                        url=url,
-                        status_code=0,
-                        content_length=0,
-                        error="Request timed out"
-                    )
-            except Exception as e:
-                if attempt == Config.MAX_RETRIES - 1:
-                    return RequestResult(
-                        method=method,
-                        url=url,
-                        status_code=0,
-                        content_length=0,
-                        error=f"Unexpected error: {str(e)}"
-                    )
-            await asyncio.sleep(1)  # Wait before retry
-    
-    def save_results(self, domain: str):
-        """Save results to file"""
-        if self.results:
-            with open(f"{domain}.txt", "a") as f:
-                f.writelines(f"{line}\n" for line in self.results)
-
-class PathGenerator:
-    """Generates various path and header combinations for testing"""
+    def __init__(self, channel):
+        super().__init__()
+        self.channel = channel
     
-    def __init__(self, base_path: str):
-        self.base_path = base_path
-        self.paths: Set[str] = set()
-        self.headers: List[Dict] = []
-        self.method_headers: List[Dict] = []
-        
-        self._generate_paths()
-        self._generate_headers()
-        self._generate_method_headers()
+    def adjust_total(self, delta: int):
+        super().adjust_total(delta)
+        self.channel.send("total", delta)
     
-    def _generate_paths(self):
-        """Generate all possible path variations"""
-        self.paths.add(self.base_path)
-        
-        # Add path pairs
-        for prefix, suffix in Config.PATH_PAIRS:
-            self.paths.add(f"{prefix}{self.base_path}{suffix}")
-        
-        # Add leading patterns
-        for lead in Config.PATH_LEADINGS:
-            self.paths.add(f"{lead}{self.base_path}")
-        
-        # Add trailing patterns
-        for trail in Config.PATH_TRAILINGS:
-            self.paths.add(f"{self.base_path}{trail}")
-            
-        # URL encoding patterns
-        encodings = [
-            "%20", "%2e", "%2f", "%3a", "%3b", "%3d", "%3f", "%40",
-            "%5c", "%7e", "%25", "%2d", "%2b", "%2a", "%23", "%26",
-            "%3c", "%3e", "%5b", "%5d", "%7b", "%7d", "%7c", "%5e",
-            "%60", "%27", "%22", "%3f", "%2f", "%5c", "%2a", "%3f",
-            "%3a", "%40", "%26", "%3d", "%2b", "%24", "%2c", "%3b",
-            "%3c", "%3e", "%23", "%25", "%7b", "%7d", "%7c", "%5c",
-            "%5e", "%7e", "%5b", "%5d", "%60", "%27", "%22", "%3c",
-            "%3e", "%23", "%25", "%7b", "%7d", "%7c", "%5c", "%5e",
-            "%7e", "%5b", "%5d", "%60", "%27", "%22"
-        ]
-        
-        # Generate variations for each character in the path
-        for i, char in enumerate(self.base_path):
-            if char != '/':  # Skip encoding forward slashes
-                for encoding in encodings:
-                    # Replace the character with its encoded version
-                    encoded_path = self.base_path[:i] + encoding + self.base_path[i+1:]
-                    self.paths.add(encoded_path)
-                    
-                    # Also try double encoding
-                    double_encoded = self.base_path[:i] + encoding + encoding + self.base_path[i+1:]
-                    self.paths.add(double_encoded)
-    
-    def _generate_headers(self):
-        """Generate IP spoofing and rewrite headers"""
-        # IP spoofing headers
-        self.headers.extend([
-            {header: value} 
-            for header in Config.IP_HEADERS 
-            for value in Config.IP_VALUES
-        ])
-        
-        # URL rewrite headers
-        self.headers.extend([
-            {header: self.base_path} 
-            for header in Config.REWRITE_HEADERS
-        ])
-    
-    def _generate_method_headers(self):
-        """Generate HTTP method override headers"""
-        self.method_headers.extend([
-            {header: method} 
-            for header in Config.METHOD_HEADERS 
-            for method in Config.HTTP_METHODS
-        ])
+    def print_target_info(self, url: str, path: str):
+        self.channel.send("target", url, path, self.total_requests, time.time())
+    
+    def print_progress(self, current: int, total: int):
+        self.channel.send("progress")
+    
+    def print_result(self, result: RequestResult, interesting: bool = True):
+        # Fingerprints are only needed where the classification happens; shared
+        # frozen headers are copied since they may be pickled to the parent
+        headers = dict(result.headers) if result.headers else None
+        self.channel.send("result", replace(result, fingerprint=None, headers=headers), interesting)
+    
+    def print_summary(self):
+        pass
 
-class Scanner:
-    """Main scanner class that orchestrates the testing process"""
+class Renderer:
+    """Draws the events of every scanner from one place, at a fixed frame rate
     
-    def __init__(self, url: str, path: str):
-        self.url = url.rstrip("/")
-        self.path = path
-        self.domain = tldextract.extract(self.url).domain
-        self.path_generator = PathGenerator(path)
-        self.request_manager = RequestManager()
-        self.display = DisplayManager()
+    Scanners only queue events, so a slow terminal never holds up the scan.
+    Each frame drains the queue, aggregates the counters in one
+    DisplayManager and writes its output in a single call; the progress bar
+    is only redrawn once per frame, and not at all without a TTY.
+    """
     
-    async def scan(self):
-        """Perform the scanning process"""
-        self.display.print_target_info(self.url, self.path)
-        
-        # Calculate total requests
-        total_requests = (
-            1 +  # POST request
-            len(self.path_generator.paths) +
-            len(self.path_generator.headers) +
-            len(self.path_generator.method_headers)
-        )
-        self.display.total_requests = total_requests
-        
-        async with self.request_manager:
-            # Test POST request
-            result = await self.request_manager.make_request("POST", f"{self.url}{self.path}")
-            if result:
-                self.display.print_result(result)
-            
-            # Test all path variations
-            path_tasks = [
-                self.request_manager.make_request("GET", f"{self.url}{path}")
-                for path in self.path_generator.paths
-            ]
-            for i, result in enumerate(await asyncio.gather(*path_tasks), 1):
-                if result:
-                    self.display.print_result(result)
-                self.display.print_progress(i, total_requests)
-            
-            # Test all headers
-            header_tasks = [
-                self.request_manager.make_request("GET", f"{self.url}{self.path}", header)
-                for header in self.path_generator.headers
-            ]
-            for i, result in enumerate(await asyncio.gather(*header_tasks), len(path_tasks) + 1):
-                if result:
-                    self.display.print_result(result)
-                self.display.print_progress(i, total_requests)
-            
-            # Test method override headers
-            method_tasks = [
-                self.request_manager.make_request("GET", f"{self.url}{self.path}", header)
-                for header in self.path_generator.method_headers
-            ]
-            for i, result in enumerate(await asyncio.gather(*method_tasks), 
-                                     len(path_tasks) + len(header_tasks) + 1):
-                if result:
-                    self.display.print_result(result)
-                self.display.print_progress(i, total_requests)
-        
-        # Save results and display summary
-        self.request_manager.save_results(self.domain)
+    def __init__(self, display: Optional[DisplayManager] = None, quiet: bool = False,
+                 frame_rate: float = Config.FRAME_RATE, tty: Optional[bool] = None):
+        self.display = display or DisplayManager()
+        self.display.quiet = quiet
+        self.quiet = quiet
+        self.interval = 1 / frame_rate
+        self.tty = sys.stdout.isatty() if tty is None else tty
+        self.completed = 0
+        self.stats: Counter = Counter()
+        self.timings: Dict[str, LatencyHistogram] = {}
+        self._events: deque = deque()
+        self._closed = False
+    
+    def send(self, *event):
+        """Queue one event from a scanner"""
+        self._events.append(event)
+    
+    def handle(self, kind: str, *payload):
+        """Apply one event to the aggregated display"""
+        if kind == "target":
+            url, path, total, started = payload
+            if self.display.startup_time is None:
+                # Time from process start until the first target began scanning
+                self.display.startup_time = started - STARTED_AT
+            self.display.total_requests += total
+            if not self.quiet:
+                self.display.print_target_info(url, path)
+        elif kind == "total":
+            self.display.total_requests += payload[0]
+        elif kind == "result":
+            self.display.print_result(*payload)
+        elif kind == "progress":
+            self.completed += 1
+        elif kind == "stats":
+            stats = dict(payload[0])
+            for stage, snapshot in stats.pop("timings", {}).items():
+                self.timings.setdefault(stage, LatencyHistogram()).merge(snapshot)
+            self.stats.update(stats)
+    
+    def draw(self, events: Iterable[Tuple] = ()):
+        """Handle a batch of events and write the resulting frame at once"""
+        frame = io.StringIO()
+        with contextlib.redirect_stdout(frame):
+            while self._events:
+                self.handle(*self._events.popleft())
+            for event in events:
+                self.handle(*event)
+            if self.tty and not self.quiet and self.display.total_requests:
+                self.display.print_progress(self.completed, self.display.total_requests)
+        if frame.tell():
+            sys.stdout.write(frame.getvalue())
+            sys.stdout.flush()
+    
+    async def run(self):
+        """Redraw every frame until closed and drained"""
+        while not self._closed or self._events:
+            await asyncio.sleep(self.interval)
+            self.draw()
+    
+    def close(self):
+        self._closed = True
+    
+    def print_summary(self):
+        """Display the aggregated summary of every scanner"""
         self.display.print_summary()
-
-class ArgumentParser:
-    """Handles command line argument parsing and validation"""
+        self.print_stats()
     
-    def __init__(self):
-        self.parser = argparse.ArgumentParser(
-            description="403 Bypass Tool - A  tool for bypassing 403 Forbidden responses"
+    def print_stats(self):
+        """Display the aggregated pool, input, pre-flight, distribution and timing counters"""
+        created, reused = self.stats["created"], self.stats["reused"]
+        self.display.print_pool_stats(
+            created, reused, reused / (created + reused) if created + reused else 0.0,
+            self.stats["retries"], self.stats["throttled"], self.stats["http2"]
+        )
+        if self.stats["duplicate_urls"] or self.stats["invalid_urls"]:
+            self.display.print_targets(self.stats["urls_read"], self.stats["duplicate_urls"],
+                                       self.stats["invalid_urls"], self.stats["dedup_bytes"])
+        if self.stats["preflight"] or self.stats["dead_hosts"]:
+            skipped = {
+                key.partition(":")[2]: count for key, count in self.stats.items()
+                if key.startswith("skipped:") and count
+            }
+            self.display.print_preflight(self.stats["preflight"], self.stats["dead_hosts"], skipped)
+        if self.stats["remote_workers"]:
+            self.display.print_distributed(self.stats["remote_workers"], self.stats["leased"],
+                                           self.stats["leases_expired"], self.stats["reassigned"])
+        if any(histogram.count for histogram in self.timings.values()):
+            self.display.print_timings(self.timings)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = email_utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), Config.MAX_RETRY_AFTER)
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt"""
+    return random.uniform(0, min(Config.MAX_BACKOFF, Config.BACKOFF_BASE * 2 ** attempt))
+
+@dataclass
+class HostRate:
+    """Token bucket and latency window of one host"""
+    rate: float
+    tokens: float
+    updated: float
+    # Requests let through while the host is uncapped
+    sent: int = 0
+    paused_until: float = 0.0
+    last_decrease: float = 0.0
+    best_p50: float = math.inf
+    latencies: deque = field(default_factory=lambda: deque(maxlen=Config.LATENCY_WINDOW))
+
+class HostRateController:
+    """Per-host token buckets whose rate follows AIMD on latency and throttling
+    
+    Without an initial rate a host is uncapped until its first decrease,
+    which starts it at half the rate it was actually served at. Every
+    normal response adds RATE_INCREASE to the host's rate. A 429/503, a
+    timeout, or a p95 latency that grows past LATENCY_FACTOR times the best
+    p50 seen so far halves it, at most once per RATE_DECREASE_COOLDOWN.
+    Retry-After pauses the host entirely. Only the `max_hosts` most recently
+    used hosts are tracked; a host evicted after that long idle starts over.
+    """
+    
+    def __init__(self, initial_rate: Optional[float] = None, max_rate: Optional[float] = None,
+                 max_hosts: int = Config.HOST_STATE_LIMIT):
+        self.max_rate = max_rate or math.inf
+        self.initial_rate = min(initial_rate or math.inf, self.max_rate)
+        self.max_hosts = max_hosts
+        self.throttled = 0
+        self._hosts: OrderedDict[str, HostRate] = OrderedDict()
+    
+    def _state(self, host: str) -> HostRate:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostRate(
+                rate=self.initial_rate, tokens=self.initial_rate, updated=time.monotonic()
+            )
+            if len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(host)
+        return state
+    
+    def rate(self, host: str) -> float:
+        """Current request rate allowed for a host"""
+        return self._state(host).rate
+    
+    async def acquire(self, host: str):
+        """Wait until the host's bucket has a token (and any pause is over)"""
+        state = self._state(host)
+        while True:
+            now = time.monotonic()
+            if state.paused_until > now:
+                await asyncio.sleep(state.paused_until - now)
+                continue
+            if state.rate == math.inf:
+                state.sent += 1
+                return
+            # Burst capacity is one second worth of requests
+            state.tokens = min(max(state.rate, 1.0), state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            if state.tokens >= 1:
+                state.tokens -= 1
+                return
+            await asyncio.sleep((1 - state.tokens) / state.rate)
+    
+    def _decrease(self, state: HostRate):
+        now = time.monotonic()
+        if now - state.last_decrease < Config.RATE_DECREASE_COOLDOWN:
+            return
+        state.last_decrease = now
+        if state.rate == math.inf:
+            # Measured over the whole time the host was uncapped
+            state.rate = state.sent / max(now - state.updated, 0.1)
+            state.tokens = 0.0
+            state.updated = now
+        state.rate = max(Config.MIN_RATE, state.rate * Config.RATE_DECREASE)
+        state.tokens = min(state.tokens, state.rate)
+        # Latencies from before the decrease say nothing about the new rate
+        state.latencies.clear()
+    
+    def throttle(self, host: str, retry_after: Optional[float] = None):
+        """Back off after a throttling response or a timeout"""
+        state = self._state(host)
+        self.throttled += 1
+        self._decrease(state)
+        if retry_after:
+            state.paused_until = max(state.paused_until, time.monotonic() + retry_after)
+    
+    def observe(self, host: str, latency: float, status: int, retry_after: Optional[float] = None):
+        """Feed one completed response into the host's controller"""
+        if status in Config.THROTTLE_STATUSES:
+            self.throttle(host, retry_after)
+            return
+        
+        state = self._state(host)
+        state.latencies.append(latency)
+        if len(state.latencies) >= Config.LATENCY_WINDOW // 2:
+            ordered = sorted(state.latencies)
+            p50 = ordered[len(ordered) // 2]
+            p95 = ordered[int(len(ordered) * 0.95)]
+            state.best_p50 = min(state.best_p50, p50)
+            if p95 > Config.LATENCY_FLOOR and p95 > state.best_p50 * Config.LATENCY_FACTOR:
+                self._decrease(state)
+                return
+        state.rate = min(self.max_rate, state.rate + Config.RATE_INCREASE)
+
+class LatencyHistogram:
+    """Streaming histogram over fixed latency buckets; merges across processes"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = Config.LATENCY_BUCKETS):
+        self.buckets = buckets
+        # One count per bucket plus the +Inf overflow bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, snapshot: Dict):
+        """Add the counts of a `to_dict()` snapshot taken with the same buckets"""
+        for index, count in enumerate(snapshot["counts"]):
+            self.counts[index] += count
+        self.count += sum(snapshot["counts"])
+        self.sum += snapshot["sum"]
+        self.max = max(self.max, snapshot["max"])
+    
+    def to_dict(self) -> Dict:
+        return {"counts": list(self.counts), "sum": self.sum, "max": self.max}
+    
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket, capped at the largest value"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    return self.max
+                lower = self.buckets[index - 1] if index else 0.0
+                return min(self.max, lower + (self.buckets[index] - lower) * (rank - cumulative) / count)
+            cumulative += count
+        return self.max
+
+class RequestTiming:
+    """Stage timestamps of one request attempt, filled in by the session trace hooks"""
+    
+    __slots__ = ("queued", "sent", "headers", "durations", "_started")
+    
+    def __init__(self, queued: float):
+        self.queued = queued
+        self.sent: Optional[float] = None
+        self.headers: Optional[float] = None
+        self.durations: Dict[str, float] = {}
+        self._started: Dict[str, float] = {}
+    
+    def start(self, stage: str):
+        self._started[stage] = time.monotonic()
+    
+    def end(self, stage: str):
+        started = self._started.pop(stage, None)
+        if started is not None:
+            self.durations[stage] = self.durations.get(stage, 0.0) + time.monotonic() - started
+    
+    def breakdown(self, finished: float) -> Dict[str, float]:
+        """Split the attempt into queueing, DNS, connect, TTFB and body read"""
+        pool = self.durations.get("pool", 0.0)
+        dns = self.durations.get("dns", 0.0)
+        # DNS resolution happens inside connection creation
+        create = self.durations.get("connect", 0.0)
+        sent = self.sent if self.sent is not None else self.queued
+        headers = self.headers if self.headers is not None else finished
+        return {
+            "queue": sent - self.queued + pool,
+            "dns": dns,
+            "connect": max(0.0, create - dns),
+            "ttfb": max(0.0, headers - sent - pool - create),
+            "body": finished - headers,
+            "total": finished - self.queued
+        }
+
+class ScanMetrics:
+    """Live telemetry of one process: stage histograms, counters and gauges
+    
+    Histograms are labelled by host and technique phase. Hosts beyond
+    METRICS_MAX_HOSTS share the "other" label to bound the series count.
+    """
+    
+    STAGES = ("queue", "dns", "connect", "ttfb", "body", "total")
+    
+    def __init__(self, max_hosts: int = Config.METRICS_MAX_HOSTS,
+                 rate_window: float = Config.METRICS_RATE_WINDOW):
+        self.max_hosts = max_hosts
+        self.rate_window = rate_window
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self.responses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.in_flight = 0
+        self._hosts: Set[str] = set()
+        self._recent: deque = deque()
+    
+    def _host_label(self, host: str) -> str:
+        if host in self._hosts:
+            return host
+        if len(self._hosts) < self.max_hosts:
+            self._hosts.add(host)
+            return host
+        return "other"
+    
+    def _completed(self, now: float):
+        self._recent.append(now)
+        while self._recent[0] < now - self.rate_window:
+            self._recent.popleft()
+    
+    def observe(self, timing: RequestTiming, host: str, phase: str, status: int):
+        """Record the stage durations of an attempt that got a response"""
+        finished = time.monotonic()
+        host = self._host_label(host)
+        for stage, duration in timing.breakdown(finished).items():
+            key = (stage, host, phase)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.observe(duration)
+        self.responses[(host, f"{status // 100}xx")] += 1
+        self._completed(finished)
+    
+    def error(self, kind: str):
+        """Count a failed attempt by error class"""
+        self.errors[kind] += 1
+        self._completed(time.monotonic())
+    
+    @property
+    def requests_per_second(self) -> float:
+        if not self._recent:
+            return 0.0
+        now = time.monotonic()
+        return sum(1 for t in self._recent if t >= now - self.rate_window) / self.rate_window
+    
+    def stage_totals(self) -> Dict[str, LatencyHistogram]:
+        """Per-stage histograms merged over every host and phase"""
+        totals = {stage: LatencyHistogram() for stage in self.STAGES}
+        for (stage, _, _), histogram in self.histograms.items():
+            totals[stage].merge(histogram.to_dict())
+        return totals
+    
+    def render(self, request_manager: "RequestManager") -> str:
+        """Prometheus text exposition of every metric"""
+        lines = [
+            "# HELP bypass_request_stage_seconds Time spent in each stage of a request attempt",
+            "# TYPE bypass_request_stage_seconds histogram"
+        ]
+        for (stage, host, phase), histogram in sorted(self.histograms.items()):
+            labels = f'stage="{stage}",host="{prometheus_escape(host)}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'bypass_request_stage_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'bypass_request_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"bypass_request_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"bypass_request_stage_seconds_count{{{labels}}} {histogram.count}")
+        
+        lines += [
+            "# HELP bypass_responses_total Responses received, by host and status class",
+            "# TYPE bypass_responses_total counter"
+        ]
+        for (host, status), count in sorted(self.responses.items()):
+            lines.append(f'bypass_responses_total{{host="{prometheus_escape(host)}",status="{status}"}} {count}')
+        lines += [
+            "# HELP bypass_errors_total Failed request attempts, by error class",
+            "# TYPE bypass_errors_total counter"
+        ]
+        for kind, count in sorted(self.errors.items()):
+            lines.append(f'bypass_errors_total{{class="{kind}"}} {count}')
+        
+        factory = request_manager.session_factory
+        rate_controller = request_manager.rate_controller
+        scalars = (
+            ("in_flight", "gauge", "Requests currently on the wire", self.in_flight),
+            ("requests_per_second", "gauge",
+             f"Completed attempts per second over the last {self.rate_window:g}s",
+             self.requests_per_second),
+            ("retries_total", "counter", "Attempts retried after a retryable failure",
+             request_manager.retries),
+            ("throttled_total", "counter", "Rate decreases caused by throttling responses",
+             rate_controller.throttled if rate_controller else 0),
+            ("pool_connections_created_total", "counter", "Connections opened by the pool",
+             factory.connections_created),
+            ("pool_connections_reused_total", "counter", "Requests sent over a pooled connection",
+             factory.connections_reused),
+            ("pool_reuse_ratio", "gauge", "Share of requests sent over a pooled connection",
+             factory.reuse_ratio)
+        )
+        for name, kind, description, value in scalars:
+            lines += [
+                f"# HELP bypass_{name} {description}",
+                f"# TYPE bypass_{name} {kind}",
+                f"bypass_{name} {value:g}"
+            ]
+        return "\n".join(lines) + "\n"
+
+def prometheus_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class MetricsServer:
+    """Serves the live metrics of this process at /metrics"""
+    
+    def __init__(self, metrics: ScanMetrics, request_manager: "RequestManager",
+                 port: int, host: str = Config.METRICS_HOST):
+        self.metrics = metrics
+        self.request_manager = request_manager
+        self.host = host
+        self.port = port
+        self._runner = None
+    
+    async def _handle(self, request) -> "web.Response":
+        from aiohttp import web
+        return web.Response(
+            text=self.metrics.render(self.request_manager),
+            content_type="text/plain", charset="utf-8",
+            headers={"X-Prometheus-Format": "0.0.4"}
+        )
+    
+    async def __aenter__(self):
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._runner:
+            await self._runner.cleanup()
+
+@contextlib.contextmanager
+def profiled(path: Optional[str], report: bool = True):
+    """Profile the enclosed block into `path` (pstats format), printing the hottest calls"""
+    if not path:
+        yield
+        return
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        if report:
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(Config.PROFILE_TOP)
+
+class SessionFactory:
+    """Hands out one process-wide aiohttp session backed by a tuned connection pool"""
+    
+    def __init__(self):
+        self.limit = Config.POOL_LIMIT
+        self.limit_per_host = Config.PER_HOST_LIMIT
+        self.keepalive_timeout = Config.KEEPALIVE_TIMEOUT
+        self.dns_cache_ttl = Config.DNS_CACHE_TTL
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.http2_requests = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._users = 0
+    
+    def configure(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                  keepalive_timeout: Optional[float] = None, dns_cache_ttl: Optional[int] = None):
+        """Tune the pool; only takes effect before the session is first created"""
+        if limit is not None:
+            self.limit = limit
+        if limit_per_host is not None:
+            self.limit_per_host = limit_per_host
+        if keepalive_timeout is not None:
+            self.keepalive_timeout = keepalive_timeout
+        if dns_cache_ttl is not None:
+            self.dns_cache_ttl = dns_cache_ttl
+    
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests served over an already open connection"""
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+    
+    async def _on_connection_create(self, session, context, params):
+        self.connections_created += 1
+    
+    async def _on_connection_reuse(self, session, context, params):
+        self.connections_reused += 1
+    
+    @staticmethod
+    def _timing_hook(stage: str, start: bool):
+        """Trace hook marking the start or end of a stage on the request's RequestTiming"""
+        async def hook(session, context, params):
+            timing = context.trace_request_ctx
+            if isinstance(timing, RequestTiming):
+                if start:
+                    timing.start(stage)
+                else:
+                    timing.end(stage)
+        return hook
+    
+    @staticmethod
+    async def _on_request_start(session, context, params):
+        if isinstance(context.trace_request_ctx, RequestTiming):
+            context.trace_request_ctx.sent = time.monotonic()
+    
+    @staticmethod
+    async def _on_request_end(session, context, params):
+        # Fired once the response headers have been read
+        if isinstance(context.trace_request_ctx, RequestTiming):
+            context.trace_request_ctx.headers = time.monotonic()
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Build the shared session and its connector"""
+        import aiohttp
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            force_close=False,
+            enable_cleanup_closed=True
+        )
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        for stage, start_signal, end_signal in (
+            ("pool", trace_config.on_connection_queued_start, trace_config.on_connection_queued_end),
+            ("connect", trace_config.on_connection_create_start, trace_config.on_connection_create_end),
+            ("dns", trace_config.on_dns_resolvehost_start, trace_config.on_dns_resolvehost_end)
+        ):
+            start_signal.append(self._timing_hook(stage, start=True))
+            end_signal.append(self._timing_hook(stage, start=False))
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+    
+    @staticmethod
+    def wire_target(url: str) -> str:
+        """Request target actually written for `url`, after yarl's normalization"""
+        import yarl
+        parsed = yarl.URL(url)
+        if parsed.raw_query_string:
+            return f"{parsed.raw_path}?{parsed.raw_query_string}"
+        return parsed.raw_path
+    
+    @cached_property
+    def errors(self) -> Tuple[type, ...]:
+        """Exceptions of a request that failed on the wire"""
+        import aiohttp
+        return (aiohttp.ClientError, TransportError)
+    
+    def acquire(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        self._users += 1
+        return self._session
+    
+    async def release(self):
+        """Drop one user of the session and close it when nobody is left"""
+        self._users = max(0, self._users - 1)
+        if self._users == 0 and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+# Shared by every RequestManager in the process
+SESSIONS = SessionFactory()
+
+class TransportError(Exception):
+    """Broken connection or malformed response in an engine other than aiohttp"""
+
+def split_target(url: str) -> Tuple[str, str, str]:
+    """Split a URL into scheme, authority and the request target, exactly as written"""
+    scheme, _, rest = url.partition("://")
+    end = len(rest)
+    for delimiter in "/?#":
+        index = rest.find(delimiter)
+        if index != -1:
+            end = min(end, index)
+    authority, target = rest[:end].rpartition("@")[2], rest[end:]
+    if not target.startswith("/"):
+        target = "/" + target
+    return scheme.lower(), authority, target
+
+def split_authority(scheme: str, authority: str) -> Tuple[str, int]:
+    """Host and port of an authority, defaulting the port from the scheme"""
+    if authority.startswith("["):
+        end = authority.find("]")
+        host, port = authority[1:end], authority[end + 2:]
+    else:
+        host, _, port = authority.partition(":")
+    return host, int(port) if port else DEFAULT_PORTS.get(scheme, 80)
+
+class RawConnection:
+    """One pooled keep-alive connection"""
+    
+    __slots__ = ("key", "reader", "writer", "idle_since")
+    
+    def __init__(self, key: Tuple[str, str, int], reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+    
+    def close(self):
+        self.writer.close()
+
+class RawResponse:
+    """Response of the raw engine, shaped like the parts of ClientResponse the scanner reads"""
+    
+    def __init__(self, connection: RawConnection, method: str, version: str, status: int,
+                 headers: "multidict.CIMultiDict", deadline: float):
+        self.connection = connection
+        self.status = status
+        self.headers = multidict.CIMultiDictProxy(headers)
+        self.deadline = deadline
+        # The body is read through `response.content`, as with aiohttp
+        self.content = self
+        
+        self.chunked = "chunked" in headers.get("Transfer-Encoding", "").lower()
+        length = headers.get("Content-Length", "")
+        self.content_length = int(length) if length.isdigit() and not self.chunked else None
+        connection_header = headers.get("Connection", "").lower()
+        self.keep_alive = (
+            connection_header == "keep-alive" if version == "HTTP/1.0" else connection_header != "close"
+        )
+        
+        if method == "HEAD" or status in (204, 304):
+            self._remaining: Optional[int] = 0
+        elif self.chunked:
+            self._remaining = None
+        elif self.content_length is not None:
+            self._remaining = self.content_length
+        else:
+            # Delimited by the server closing the connection
+            self._remaining = None
+            self.keep_alive = False
+        self._chunk_left = 0
+        self._eof = self._remaining == 0
+    
+    def at_eof(self) -> bool:
+        return self._eof
+    
+    async def _wait(self, awaitable: Awaitable):
+        return await asyncio.wait_for(awaitable, max(0.0, self.deadline - time.monotonic()))
+    
+    async def _read_chunked(self, size: int) -> bytes:
+        reader = self.connection.reader
+        if not self._chunk_left:
+            line = await self._wait(reader.readline())
+            self._chunk_left = int(line.split(b";")[0].strip() or b"0", 16)
+            if not self._chunk_left:
+                # Skip any trailer fields
+                while (await self._wait(reader.readline())).strip():
+                    pass
+                self._eof = True
+                return b""
+        data = await self._wait(reader.readexactly(min(size, self._chunk_left)))
+        self._chunk_left -= len(data)
+        if not self._chunk_left:
+            await self._wait(reader.readexactly(2))
+        return data
+    
+    async def _read(self, size: int) -> bytes:
+        if self.chunked:
+            return await self._read_chunked(size)
+        reader = self.connection.reader
+        if self._remaining is None:
+            data = await self._wait(reader.read(size))
+            self._eof = not data
+            return data
+        data = await self._wait(reader.readexactly(min(size, self._remaining)))
+        self._remaining -= len(data)
+        self._eof = not self._remaining
+        return data
+    
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        """Yield the decoded body in chunks of at most `size` bytes"""
+        while not self._eof:
+            try:
+                chunk = await self._read(size)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                raise TransportError(f"Body read failed: {e}") from e
+            if chunk:
+                yield chunk
+
+class RawRequest:
+    """Async context manager around one raw request, returning its connection on exit"""
+    
+    def __init__(self, session: "RawSession", method: str, url: str,
+                 headers: Optional[Mapping[str, str]], timeout: float, timing: Optional[RequestTiming]):
+        self.session = session
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.deadline = time.monotonic() + timeout
+        self.timing = timing
+        self.response: Optional[RawResponse] = None
+    
+    async def __aenter__(self) -> RawResponse:
+        self.response = await asyncio.wait_for(
+            self.session._send(self.method, self.url, self.headers, self.deadline, self.timing),
+            max(0.0, self.deadline - time.monotonic())
+        )
+        return self.response
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.session._release(self.response, reusable=exc_type is None)
+
+class RawSession:
+    """HTTP/1.1 client on asyncio streams that writes every request target byte for byte
+    
+    Unlike aiohttp/yarl it never normalizes the URL: dot segments, encoded
+    characters, empty queries and fragments all reach the server as
+    written. Connections are kept alive in a per-host LIFO pool.
+    """
+    
+    BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+    
+    def __init__(self, factory: "RawSessionFactory"):
+        self.factory = factory
+        self.closed = False
+        self._idle: Dict[Tuple[str, str, int], List[RawConnection]] = {}
+        self._dns: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._ssl = None
+        self._swept = time.monotonic()
+    
+    def request(self, method: str, url: str, headers: Optional[Mapping[str, str]] = None,
+                timeout: float = Config.TIMEOUT, trace_request_ctx=None) -> RawRequest:
+        timing = trace_request_ctx if isinstance(trace_request_ctx, RequestTiming) else None
+        return RawRequest(self, method, url, headers, timeout, timing)
+    
+    def _encode(self, method: str, authority: str, target: str,
+                headers: Optional[Mapping[str, str]]) -> bytes:
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {authority}",
+            f"User-Agent: {Config.RAW_USER_AGENT}",
+            "Accept: */*"
+        ]
+        if headers:
+            lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if method in self.BODY_METHODS:
+            lines.append("Content-Length: 0")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+    
+    async def _resolve(self, host: str, port: int, timing: Optional[RequestTiming]) -> List[str]:
+        """Addresses of a host, cached for the configured DNS TTL"""
+        now = time.monotonic()
+        cached = self._dns.get((host, port))
+        if cached and cached[0] > now:
+            return cached[1]
+        if timing:
+            timing.start("dns")
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        if timing:
+            timing.end("dns")
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._dns[(host, port)] = (now + self.factory.dns_cache_ttl, addresses)
+        return addresses
+    
+    def _ssl_context(self):
+        if self._ssl is None:
+            import ssl
+            self._ssl = ssl.create_default_context()
+        return self._ssl
+    
+    async def _connect(self, key: Tuple[str, str, int], timing: Optional[RequestTiming]) -> RawConnection:
+        scheme, host, port = key
+        if timing:
+            timing.start("connect")
+        error: Optional[OSError] = None
+        tls = scheme == "https"
+        for address in await self._resolve(host, port, timing):
+            try:
+                reader, writer = await asyncio.open_connection(
+                    address, port,
+                    ssl=self._ssl_context() if tls else None,
+                    server_hostname=host if tls else None
+                )
+                break
+            except OSError as e:
+                error = e
+        else:
+            raise error or OSError(f"No address for {host}")
+        if timing:
+            timing.end("connect")
+        self.factory.connections_created += 1
+        return RawConnection(key, reader, writer)
+    
+    def _checkout(self, key: Tuple[str, str, int]) -> Optional[RawConnection]:
+        """Most recently used idle connection of a host that is still usable"""
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            connection = idle.pop()
+            if now - connection.idle_since < self.factory.keepalive_timeout and not connection.reader.at_eof():
+                self.factory.connections_reused += 1
+                return connection
+            connection.close()
+        return None
+    
+    async def _read_head(self, connection: RawConnection, method: str, deadline: float) -> RawResponse:
+        """Read the status line and headers, skipping interim 1xx responses"""
+        reader = connection.reader
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise TransportError("Connection closed before the response")
+            version, _, rest = line.decode("latin-1").rstrip("\r\n").partition(" ")
+            if not version.startswith("HTTP/") or not rest[:3].isdigit():
+                raise TransportError(f"Malformed status line: {line[:100]!r}")
+            status = int(rest[:3])
+            headers = multidict.CIMultiDict()
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    if not line:
+                        raise TransportError("Connection closed in the response headers")
+                    break
+                if len(headers) >= Config.RAW_MAX_HEADERS:
+                    raise TransportError("Too many response headers")
+                name, separator, value = line.decode("latin-1").partition(":")
+                if not separator:
+                    raise TransportError(f"Malformed header line: {line[:100]!r}")
+                headers.add(name.strip(), value.strip())
+            if 100 <= status < 200 and status != 101:
+                continue
+            return RawResponse(connection, method, version, status, headers, deadline)
+    
+    async def _send(self, method: str, url: str, headers: Optional[Mapping[str, str]],
+                    deadline: float, timing: Optional[RequestTiming]) -> RawResponse:
+        scheme, authority, target = split_target(url)
+        host, port = split_authority(scheme, authority)
+        key = (scheme, host, port)
+        payload = self._encode(method, authority, target, headers)
+        if timing:
+            timing.sent = time.monotonic()
+        
+        while True:
+            connection = self._checkout(key)
+            reused = connection is not None
+            if connection is None:
+                try:
+                    connection = await self._connect(key, timing)
+                except OSError as e:
+                    raise TransportError(f"Cannot connect to {authority}: {e}") from e
+            try:
+                connection.writer.write(payload)
+                await connection.writer.drain()
+                response = await self._read_head(connection, method, deadline)
+            except (OSError, asyncio.IncompleteReadError, ValueError, TransportError) as e:
+                connection.close()
+                # The server may have dropped an idle connection: retry on a fresh one
+                if reused:
+                    continue
+                raise e if isinstance(e, TransportError) else TransportError(str(e)) from e
+            except BaseException:
+                # Cancelled by the timeout with the response half read
+                connection.close()
+                raise
+            if timing:
+                timing.headers = time.monotonic()
+            return response
+    
+    def _release(self, response: Optional[RawResponse], reusable: bool):
+        """Pool the connection if its response was read completely, close it otherwise"""
+        if response is None:
+            return
+        connection = response.connection
+        now = time.monotonic()
+        if self.closed or not (reusable and response.keep_alive and response.at_eof()):
+            connection.close()
+        else:
+            idle = self._idle.setdefault(connection.key, [])
+            if len(idle) < self.factory.limit_per_host:
+                connection.idle_since = now
+                idle.append(connection)
+            else:
+                connection.close()
+        if now - self._swept > self.factory.keepalive_timeout:
+            self._sweep(now)
+    
+    def _sweep(self, now: float):
+        """Close idle connections past the keep-alive timeout"""
+        self._swept = now
+        for key in list(self._idle):
+            alive = []
+            for connection in self._idle[key]:
+                if now - connection.idle_since < self.factory.keepalive_timeout:
+                    alive.append(connection)
+                else:
+                    connection.close()
+            if alive:
+                self._idle[key] = alive
+            else:
+                del self._idle[key]
+    
+    async def close(self):
+        self.closed = True
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+class RawSessionFactory(SessionFactory):
+    """SessionFactory handing out a RawSession instead of an aiohttp session"""
+    
+    errors = (TransportError,)
+    
+    def _create_session(self) -> RawSession:
+        return RawSession(self)
+    
+    @staticmethod
+    def wire_target(url: str) -> str:
+        return split_target(url)[2]
+
+class Http2Response:
+    """httpx response shaped like the parts of ClientResponse the scanner reads"""
+    
+    def __init__(self, response: "httpx.Response"):
+        self.response = response
+        self.status = response.status_code
+        self.headers = response.headers
+        length = response.headers.get("Content-Length", "")
+        self.content_length = int(length) if length.isdigit() else None
+        # The body is read through `response.content`, as with aiohttp
+        self.content = self
+        self._eof = False
+    
+    def at_eof(self) -> bool:
+        return self._eof
+    
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        """Yield the decoded body in chunks of at most `size` bytes"""
+        import httpx
+        try:
+            async for chunk in self.response.aiter_bytes(size):
+                yield chunk
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError() from e
+        except httpx.HTTPError as e:
+            raise TransportError(f"Body read failed: {e}") from e
+        self._eof = True
+
+class Http2Trace:
+    """httpcore trace extension feeding the pool counters and stage timings of one request"""
+    
+    __slots__ = ("factory", "timing", "connected")
+    
+    def __init__(self, factory: "Http2SessionFactory", timing: Optional[RequestTiming]):
+        self.factory = factory
+        self.timing = timing
+        self.connected = False
+    
+    async def __call__(self, event: str, info: Dict):
+        timing = self.timing
+        if event in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            if timing:
+                timing.start("connect")
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            if timing:
+                timing.end("connect")
+            if event == "connection.connect_tcp.complete":
+                self.connected = True
+                self.factory.connections_created += 1
+        elif event.endswith(".send_request_headers.started"):
+            if not self.connected:
+                # A new stream (HTTP/2) or request (HTTP/1.1) on an open connection
+                self.factory.connections_reused += 1
+        elif event.endswith(".receive_response_headers.complete"):
+            if timing:
+                timing.headers = time.monotonic()
+            if event.startswith("http2."):
+                self.factory.http2_requests += 1
+
+class Http2Request:
+    """Async context manager around one httpx request"""
+    
+    def __init__(self, session: "Http2Session", method: str, url: str,
+                 headers: Optional[Mapping[str, str]], timeout: float, timing: Optional[RequestTiming]):
+        self.session = session
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.timeout = timeout
+        self.timing = timing
+        self._stream = None
+    
+    async def _open(self, client: "httpx.AsyncClient") -> Http2Response:
+        self._stream = client.stream(
+            self.method, self.url, headers=self.headers, timeout=self.timeout,
+            extensions={"trace": Http2Trace(self.session.factory, self.timing)}
+        )
+        return Http2Response(await self._stream.__aenter__())
+    
+    async def __aenter__(self) -> Http2Response:
+        import httpx
+        if self.timing:
+            self.timing.sent = time.monotonic()
+        client, prior_knowledge = self.session.client_for(self.url)
+        try:
+            try:
+                return await self._open(client)
+            except httpx.RemoteProtocolError:
+                if not prior_knowledge:
+                    raise
+                # Not an h2c server: speak HTTP/1.1 to this host from now on
+                self.session.http1_hosts.add(host_of(self.url))
+                return await self._open(self.session.client)
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError() from e
+        except httpx.HTTPError as e:
+            raise TransportError(str(e) or type(e).__name__) from e
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._stream:
+            await self._stream.__aexit__(exc_type, exc_val, exc_tb)
+
+class Http2Session:
+    """httpx clients multiplexing requests over a few HTTP/2 connections per host
+    
+    HTTPS hosts negotiate HTTP/2 through ALPN and fall back to HTTP/1.1 by
+    themselves. With prior knowledge, http:// hosts are spoken to in h2c
+    directly; a host that does not answer in HTTP/2 is switched to
+    HTTP/1.1 for the rest of the scan.
+    """
+    
+    def __init__(self, factory: "Http2SessionFactory"):
+        import httpx
+        self.factory = factory
+        self.closed = False
+        self.http1_hosts: Set[str] = set()
+        limits = httpx.Limits(
+            max_connections=factory.limit,
+            max_keepalive_connections=factory.limit,
+            keepalive_expiry=factory.keepalive_timeout
+        )
+        self.client = httpx.AsyncClient(http2=True, limits=limits, trust_env=False)
+        self.h2c = None
+        if factory.prior_knowledge:
+            self.h2c = httpx.AsyncClient(http1=False, http2=True, limits=limits, trust_env=False)
+    
+    def client_for(self, url: str) -> Tuple["httpx.AsyncClient", bool]:
+        """Client to send a URL with, and whether it assumes h2c"""
+        if self.h2c and url.startswith("http://") and host_of(url) not in self.http1_hosts:
+            return self.h2c, True
+        return self.client, False
+    
+    def request(self, method: str, url: str, headers: Optional[Mapping[str, str]] = None,
+                timeout: float = Config.TIMEOUT, trace_request_ctx=None) -> Http2Request:
+        timing = trace_request_ctx if isinstance(trace_request_ctx, RequestTiming) else None
+        return Http2Request(self, method, url, headers, timeout, timing)
+    
+    async def close(self):
+        self.closed = True
+        await self.client.aclose()
+        if self.h2c:
+            await self.h2c.aclose()
+
+class Http2SessionFactory(SessionFactory):
+    """SessionFactory handing out an Http2Session (needs the optional httpx[http2])"""
+    
+    def __init__(self):
+        super().__init__()
+        self.prior_knowledge = False
+    
+    errors = (TransportError,)
+    
+    def _create_session(self) -> Http2Session:
+        return Http2Session(self)
+    
+    @staticmethod
+    def wire_target(url: str) -> str:
+        import httpx
+        return httpx.URL(url).raw_path.decode("ascii")
+
+ENGINES = {
+    "aiohttp": SessionFactory,
+    "raw": RawSessionFactory,
+    "http2": Http2SessionFactory
+}
+
+class RequestManager:
+    """Handles HTTP requests and response processing"""
+    
+    def __init__(self, session_factory: Optional[SessionFactory] = None,
+                 max_body: int = Config.MAX_BODY_BYTES,
+                 rate_controller: Optional[HostRateController] = None,
+                 metrics: Optional[ScanMetrics] = None):
+        self.session_factory = session_factory or SESSIONS
+        self.max_body = max_body
+        self.rate_controller = rate_controller
+        self.metrics = metrics
+        self.retries = 0
+        # Global in-flight cap, set by the Scheduler; only held while a request is on the wire
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    async def __aenter__(self):
+        if not self.session:
+            self.session = self.session_factory.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
+    async def close(self):
+        """Give the shared session back to the factory"""
+        if self.session:
+            self.session = None
+            await self.session_factory.release()
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def get_status_color(status_code: int) -> str:
+        """Get color code for status code"""
+        if status_code in (200, 201):
+            return Fore.GREEN + Style.BRIGHT
+        elif status_code in (301, 302):
+            return Fore.BLUE + Style.BRIGHT
+        elif status_code in (403, 404):
+            return Fore.MAGENTA + Style.BRIGHT
+        elif status_code == 500:
+            return Fore.RED + Style.BRIGHT
+        return Fore.WHITE + Style.BRIGHT
+    
+    async def _measure_body(self, response: aiohttp.ClientResponse) -> Tuple[int, bool, ResponseFingerprint]:
+        """Size and fingerprint the body chunk by chunk, holding one chunk at a time
+        
+        A declared Content-Length larger than the byte cap is trusted without
+        reading anything. Otherwise the body is streamed up to the cap, which
+        also lets the connection go back to the pool when it fits.
+        """
+        builder = FingerprintBuilder()
+        declared = response.content_length
+        if declared is not None and declared > self.max_body:
+            return declared, False, builder.finish(
+                response.status, declared, response.headers.keys(), complete=False,
+                server=response.headers.get("Server", "")
+            )
+        
+        truncated = False
+        async for chunk in response.content.iter_chunked(Config.CHUNK_SIZE):
+            builder.update(chunk)
+            if builder.size >= self.max_body:
+                truncated = not response.content.at_eof()
+                break
+        
+        size = declared if declared is not None else builder.size
+        return size, truncated, builder.finish(
+            response.status, size, response.headers.keys(), complete=not truncated,
+            server=response.headers.get("Server", "")
+        )
+    
+    async def _send(self, method: str, url: str, headers: Optional[Mapping[str, str]],
+                    timing: Optional[RequestTiming] = None) -> Tuple[RequestResult, Optional[float]]:
+        """Send one request; returns the result and any Retry-After delay"""
+        started = time.monotonic()
+        async with self.session.request(
+            method, url, headers=headers, timeout=Config.TIMEOUT, trace_request_ctx=timing
+        ) as response:
+            content_length, truncated, fingerprint = await self._measure_body(response)
+            result = RequestResult(
+                method=method,
+                url=url,
+                status_code=response.status,
+                content_length=content_length,
+                headers=headers,
+                body_hash=fingerprint.body_hash,
+                truncated=truncated,
+                fingerprint=fingerprint,
+                elapsed=time.monotonic() - started
+            )
+            return result, parse_retry_after(response.headers.get("Retry-After"))
+    
+    async def _send_timed(self, method: str, url: str, headers: Optional[Mapping[str, str]],
+                          queued: float) -> Tuple[RequestResult, Optional[float], Optional[RequestTiming]]:
+        """Send one attempt once a global slot is free, timing its stages when metrics are on"""
+        timing = RequestTiming(queued) if self.metrics else None
+        if self.slots:
+            await self.slots.acquire()
+        if self.metrics:
+            self.metrics.in_flight += 1
+        try:
+            result, retry_after = await self._send(method, url, headers, timing)
+        finally:
+            if self.metrics:
+                self.metrics.in_flight -= 1
+            if self.slots:
+                self.slots.release()
+        return result, retry_after, timing
+    
+    async def make_request(self, method: str, url: str, headers: Optional[Mapping[str, str]] = None,
+                           phase: str = "", queued: Optional[float] = None) -> Optional[RequestResult]:
+        """Make HTTP request, retrying only retryable failures with jittered backoff
+        
+        `queued` is when the caller started waiting to send; the time until the
+        request goes out is reported as the queueing stage of the first attempt.
+        The manager must be entered with `async with`, which holds the shared
+        session until it exits.
+        """
+        if not self.session:
+            raise RuntimeError("RequestManager is not open; use it with async with")
+        
+        host = host_of(url)
+        result = None
+        for attempt in range(Config.MAX_RETRIES):
+            retry_after = None
+            if queued is None or attempt:
+                queued = time.monotonic()
+            if self.rate_controller:
+                await self.rate_controller.acquire(host)
+            try:
+                result, retry_after, timing = await self._send_timed(method, url, headers, queued)
+                if timing:
+                    self.metrics.observe(timing, host, phase, result.status_code)
+                if self.rate_controller:
+                    self.rate_controller.observe(host, result.elapsed, result.status_code, retry_after)
+                if result.status_code not in Config.RETRY_STATUSES:
+                    return result
+            except self.session_factory.errors as e:
+                if self.metrics:
+                    self.metrics.error("connection")
+                result = RequestResult(
+                    method=method,
+                    url=url,
+                    status_code=0,
+                    content_length=0,
+                    error=f"Connection Error: {str(e)}"
+                )
+            except asyncio.TimeoutError:
+                if self.metrics:
+                    self.metrics.error("timeout")
+                if self.rate_controller:
+                    self.rate_controller.throttle(host)
+                result = RequestResult(
+                    method=method,
+                    url=url,
+                    status_code=0,
+                    content_length=0,
+                    error="Request timed out"
+                )
+            except Exception as e:
+                if self.metrics:
+                    self.metrics.error("unexpected")
+                # Not a network condition, so retrying would not help
+                return RequestResult(
+                    method=method,
+                    url=url,
+                    status_code=0,
+                    content_length=0,
+                    error=f"Unexpected error: {str(e)}"
+                )
+            if attempt < Config.MAX_RETRIES - 1:
+                self.retries += 1
+                await asyncio.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+        return result
+
+class ResultSink:
+    """Formats result records as lines of plain text"""
+    
+    extension = "txt"
+    
+    def header(self) -> str:
+        """Text written once at the top of a new file"""
+        return ""
+    
+    def format(self, record: Dict) -> str:
+        """Render one record, including its trailing newline"""
+        headers = f" {record['headers']}" if record["headers"] else ""
+        return f"{record['status_code']} {record['method']} {record['url']} {record['content_length']}{headers}\n"
+
+class JsonlSink(ResultSink):
+    """One JSON object per line"""
+    
+    extension = "jsonl"
+    
+    def format(self, record: Dict) -> str:
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+class CsvSink(ResultSink):
+    """Comma separated values with a header row"""
+    
+    extension = "csv"
+    fields = ["phase", "method", "url", "status_code", "content_length",
+              "headers", "body_hash", "truncated", "error"]
+    
+    def _row(self, values: List) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue()
+    
+    def header(self) -> str:
+        return self._row(self.fields)
+    
+    def format(self, record: Dict) -> str:
+        values = dict(record, headers=json.dumps(record["headers"]) if record["headers"] else "")
+        return self._row([values.get(name, "") for name in self.fields])
+
+SINKS = {sink.extension: sink for sink in (ResultSink, JsonlSink, CsvSink)}
+
+class BatchWriter(abc.ABC):
+    """Buffers entries in memory and writes them out in batches off the event loop
+    
+    A batch is written once `batch_size` entries are waiting or every
+    `flush_interval` seconds, so a crash loses at most one interval of data.
+    A batch that fails to write goes back to the front of the buffer and is
+    retried with the next flush; the final flush on exit raises the error.
+    """
+    
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer: List = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+    
+    def _add(self, entry):
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.batch_size:
+            self._flush_in_background()
+    
+    def _flush_in_background(self) -> asyncio.Task:
+        task = asyncio.ensure_future(self.flush())
+        self._pending.add(task)
+        task.add_done_callback(self._flushed)
+        return task
+    
+    def _flushed(self, task: asyncio.Task):
+        self._pending.discard(task)
+        if not task.cancelled():
+            task.exception()  # The batch was requeued; the final flush reports the error
+    
+    @abc.abstractmethod
+    def _write(self, batch: List):
+        """Persist one batch (runs in a worker thread)"""
+    
+    async def flush(self):
+        """Write everything buffered so far"""
+        async with self._lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+            except Exception:
+                self._buffer[:0] = batch
+                raise
+            self.written += len(batch)
+    
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Cancelling the loop must not interrupt a batch in the middle of its write
+            await asyncio.wait([self._flush_in_background()])
+    
+    async def __aenter__(self):
+        self._task = asyncio.ensure_future(self._flush_periodically())
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.flush()
+
+class SinkPipeline(BatchWriter):
+    """Buffers formatted results and appends them to one file per target
+    
+    Worker processes may share a target file: each batch is appended with
+    a single write, and a new file is created with its header in one step.
+    """
+    
+    def __init__(self, sink: ResultSink, output_dir: str = ".",
+                 batch_size: int = Config.SINK_BATCH_SIZE,
+                 flush_interval: float = Config.SINK_FLUSH_INTERVAL):
+        super().__init__(batch_size, flush_interval)
+        self.sink = sink
+        self.output_dir = Path(output_dir)
+    
+    def submit(self, target: str, record: Dict):
+        """Queue one record for the file of `target`"""
+        self._add((target, self.sink.format(record)))
+    
+    def _write(self, batch: List[Tuple[str, str]]):
+        """Append a batch to the per-target files"""
+        by_target: Dict[str, List[str]] = {}
+        for target, line in batch:
+            by_target.setdefault(target, []).append(line)
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for target, lines in by_target.items():
+            path = self.output_dir / f"{target}.{self.sink.extension}"
+            text = "".join(lines)
+            if not path.exists() and self._create(path, self.sink.header() + text):
+                continue
+            if path.stat().st_size == 0:
+                text = self.sink.header() + text
+            with open(path, "a", newline="") as f:
+                f.write(text)
+    
+    @staticmethod
+    def _create(path: Path, text: str) -> bool:
+        """Create `path` holding `text`, unless another process created it first"""
+        staged = path.with_name(f".{path.name}.{os.getpid()}")
+        with open(staged, "w", newline="") as f:
+            f.write(text)
+        try:
+            os.link(staged, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(staged)
+
+class CheckpointStore(BatchWriter):
+    """SQLite record of finished work items, keyed by a 64-bit hash of each item
+    
+    The keys of a previous run are loaded into a set on resume, so checking
+    an item is a single set lookup; stored results are only read back for
+    items that are actually skipped, off the event loop. Keys recorded by
+    the current run are never skipped.
+    
+    The owner of a store locks it for the whole run, so a second scan can
+    neither clear nor write it; worker processes share their parent's.
+    """
+    
+    def __init__(self, path: str, resume: bool = False, owner: bool = True,
+                 run_id: Optional[str] = None,
+                 batch_size: int = Config.CHECKPOINT_BATCH_SIZE,
+                 flush_interval: float = Config.SINK_FLUSH_INTERVAL):
+        super().__init__(batch_size, flush_interval)
+        self.path = path
+        self.resume = resume
+        self.owner = owner
+        self.run_id = run_id or secrets.token_hex(8)
+        self.resumed: Set[int] = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._file_lock: Optional[FileLock] = None
+    
+    @staticmethod
+    def claim(path: str, resume: bool) -> FileLock:
+        """Lock a store for this run, clearing it (WAL files included) unless resuming"""
+        lock = FileLock(path + ".lock")
+        if not lock.acquire():
+            raise CheckpointInUse(f"Checkpoint {path} is in use by another scan; choose another with --checkpoint")
+        if not resume:
+            for name in (path, path + "-wal", path + "-shm"):
+                if os.path.exists(name):
+                    os.remove(name)
+        return lock
+    
+    def open(self):
+        """Create the store, or load the keys of a previous run when resuming"""
+        if self.owner:
+            self._file_lock = self.claim(self.path, self.resume)
+        # Worker processes may write to the same store concurrently
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS done (key INTEGER PRIMARY KEY, result TEXT, run TEXT)")
+        if self.resume:
+            # Rows other workers of this run have already written are not resumed
+            self.resumed = {
+                key for key, in self._db.execute("SELECT key FROM done WHERE run IS NOT ?", (self.run_id,))
+            }
+    
+    def __contains__(self, key: int) -> bool:
+        return key in self.resumed
+    
+    def _load(self, key: int) -> Optional[RequestResult]:
+        row = self._db.execute("SELECT result FROM done WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        return RequestResult(**dict(json.loads(row[0]), replayed=True))
+    
+    async def replay(self, key: int) -> Optional[RequestResult]:
+        """Load the recorded result of a finished item in a worker thread"""
+        return await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+    
+    def record(self, key: int, result: RequestResult):
+        """Queue a finished item for the next write"""
+        self._add((key, json.dumps(result.to_dict(), separators=(",", ":")), self.run_id))
+    
+    def _write(self, batch: List[Tuple[int, str, str]]):
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO done VALUES (?, ?, ?)", batch)
+    
+    async def __aenter__(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.open)
+        return await super().__aenter__()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await super().__aexit__(exc_type, exc_val, exc_tb)
+        if self._db:
+            self._db.close()
+        if self._file_lock:
+            self._file_lock.release()
+
+class CheckpointInUse(Exception):
+    """Another scan holds the checkpoint this one would clear or write"""
+
+class FileLock:
+    """Exclusive advisory lock on a file, held until released or the process exits"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+    
+    def acquire(self) -> bool:
+        """Take the lock without waiting; False if another process holds it"""
+        self._file = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self.release()
+            return False
+        return True
+    
+    def release(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+def server_fingerprint(fingerprint: Optional[ResponseFingerprint]) -> str:
+    """Server product and CDN behind a response, e.g. "nginx|cloudflare"
+    
+    Versions are dropped so every release of a server shares its history.
+    """
+    if fingerprint is None:
+        return TechniqueHistory.UNKNOWN
+    product = re.split(r"[/\s(;]", fingerprint.server.strip(), maxsplit=1)[0].lower()
+    cdns = sorted({cdn for name, cdn in Config.CDN_HEADERS.items() if name in fingerprint.header_names})
+    return "|".join(filter(None, [product, *cdns])) or TechniqueHistory.UNKNOWN
+
+class TechniqueHistory(BatchWriter):
+    """SQLite tries and non-baseline hits per server fingerprint and technique, across runs
+    
+    The table is small (one row per fingerprint and technique), so it is
+    loaded whole when the scan starts. Counts of this run are added to it
+    in batches; rows are only ever incremented, so worker processes can
+    share the file.
+    """
+    
+    ANY = "*"
+    UNKNOWN = "unknown"
+    
+    def __init__(self, path: str, prior_weight: float = Config.HISTORY_PRIOR_WEIGHT,
+                 batch_size: int = Config.CHECKPOINT_BATCH_SIZE,
+                 flush_interval: float = Config.SINK_FLUSH_INTERVAL):
+        super().__init__(batch_size, flush_interval)
+        self.path = path
+        self.prior_weight = prior_weight
+        # fingerprint -> technique -> count, with ANY summing every fingerprint
+        self.tries: Dict[str, Counter] = {}
+        self.hits: Dict[str, Counter] = {}
+        self._db: Optional[sqlite3.Connection] = None
+    
+    def _count(self, fingerprint: str, technique: str, tries: int, hits: int):
+        for key in (fingerprint, self.ANY):
+            self.tries.setdefault(key, Counter())[technique] += tries
+            if hits:
+                self.hits.setdefault(key, Counter())[technique] += hits
+    
+    def open(self):
+        """Create the store and load the counts of earlier runs"""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS techniques (fingerprint TEXT, technique TEXT, "
+            "tries INTEGER NOT NULL, hits INTEGER NOT NULL, PRIMARY KEY (fingerprint, technique))"
+        )
+        for row in self._db.execute("SELECT fingerprint, technique, tries, hits FROM techniques"):
+            self._count(*row)
+    
+    def record(self, fingerprint: str, techniques: Iterable[str], hit: bool):
+        """Count one response for every technique that produced it"""
+        for technique in techniques:
+            self._count(fingerprint, technique, 1, int(hit))
+            self._add((fingerprint, technique, int(hit)))
+    
+    def _write(self, batch: List[Tuple[str, str, int]]):
+        counts: Dict[Tuple[str, str], List[int]] = {}
+        for fingerprint, technique, hit in batch:
+            entry = counts.setdefault((fingerprint, technique), [0, 0])
+            entry[0] += 1
+            entry[1] += hit
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO techniques VALUES (?, ?, ?, ?) ON CONFLICT (fingerprint, technique) "
+                "DO UPDATE SET tries = tries + excluded.tries, hits = hits + excluded.hits",
+                [(fingerprint, technique, tries, hits) for (fingerprint, technique), (tries, hits) in counts.items()]
+            )
+    
+    def scorer(self, fingerprint: Optional[str]) -> Callable[[Iterable[str]], float]:
+        """Estimated hit rate of a mutation's techniques against a kind of server
+        
+        A technique's rate on one fingerprint is smoothed towards its rate on
+        every server, which is smoothed towards the overall hit rate, so
+        unseen techniques rank between proven and failed ones.
+        """
+        weight = self.prior_weight
+        any_tries = self.tries.get(self.ANY, Counter())
+        any_hits = self.hits.get(self.ANY, Counter())
+        tries = self.tries.get(fingerprint, Counter())
+        hits = self.hits.get(fingerprint, Counter())
+        overall = (sum(any_hits.values()) + 1) / (sum(any_tries.values()) + 2)
+        
+        def rate(technique: str) -> float:
+            prior = (any_hits[technique] + weight * overall) / (any_tries[technique] + weight)
+            return (hits[technique] + weight * prior) / (tries[technique] + weight)
+        
+        return lambda techniques: max(map(rate, techniques), default=overall)
+    
+    async def __aenter__(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.open)
+        return await super().__aenter__()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await super().__aexit__(exc_type, exc_val, exc_tb)
+        if self._db:
+            self._db.close()
+
+class PathGenerator:
+    """Lazily generates unique path and header combinations for testing"""
+    
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        # Pairs, leadings and trailings are few, so they are deduplicated eagerly
+        self._structural: Dict[str, str] = {}
+        for technique, path in self._structural_variants():
+            self._structural.setdefault(path, technique)
+        self._encodable = [i for i, char in enumerate(base_path) if char != '/']
+        self._path_count: Optional[int] = None
+    
+    def _structural_variants(self) -> Iterator[Tuple[str, str]]:
+        """Yield (technique, path) for the fixed path patterns"""
+        yield "original", self.base_path
+        
+        # Add path pairs
+        for prefix, suffix in Config.PATH_PAIRS:
+            yield f"pair:{prefix}", f"{prefix}{self.base_path}{suffix}"
+        
+        # Add leading patterns
+        for lead in Config.PATH_LEADINGS:
+            yield f"leading:{lead}", f"{lead}{self.base_path}"
+        
+        # Add trailing patterns
+        for trail in Config.PATH_TRAILINGS:
+            yield f"trailing:{trail}", f"{self.base_path}{trail}"
+    
+    def _encoded_variants(self) -> Iterator[Tuple[str, str]]:
+        """Yield (technique, path) replacing each character with its encodings"""
+        base = self.base_path
+        for i, char in enumerate(base):
+            if char == '/':  # Skip encoding forward slashes
+                continue
+            head, tail = base[:i], base[i+1:]
+            for encoding in Config.URL_ENCODINGS:
+                # Replace the character with its encoded version
+                yield f"encode:{encoding}", head + encoding + tail
+                
+                # Also try double encoding
+                yield f"double:{encoding}", head + encoding + encoding + tail
+    
+    def _is_encoded_variant(self, path: str) -> bool:
+        """Whether `path` is also produced by `_encoded_variants`"""
+        base = self.base_path
+        width = len(path) - len(base) + 1
+        if width not in (3, 6):
+            return False
+        for i, char in enumerate(base):
+            if char == '/' or path[:i] != base[:i] or path[i+width:] != base[i+1:]:
+                continue
+            encoding = path[i:i+3]
+            if encoding in Config.URL_ENCODINGS and (width == 3 or path[i+3:i+6] == encoding):
+                return True
+        return False
+    
+    def iter_variants(self) -> Iterator[Tuple[str, str]]:
+        """Yield every unique (technique, path) pair, one at a time
+        
+        Without a '%' in the base path, two encoded variants can never
+        collide, so only the few structural paths need remembering.
+        """
+        seen = set(self._structural)
+        for path, technique in self._structural.items():
+            yield technique, path
+        
+        exact = "%" not in self.base_path
+        for technique, path in self._encoded_variants():
+            if path in seen:
+                continue
+            if not exact:
+                seen.add(path)
+            yield technique, path
+    
+    @property
+    def path_techniques(self) -> List[str]:
+        """Every path technique label `variant` accepts"""
+        techniques = list(self._structural.values())
+        if self._encodable:
+            techniques.extend(
+                f"{kind}:{encoding}"
+                for kind in ("encode", "double")
+                for encoding in Config.URL_ENCODINGS
+            )
+        return techniques
+    
+    def variant(self, technique: str, rng: random.Random) -> str:
+        """Build one path for a technique label, picking a random position to encode"""
+        kind, _, encoding = technique.partition(":")
+        if kind not in ("encode", "double"):
+            return next(path for path, label in self._structural.items() if label == technique)
+        i = rng.choice(self._encodable)
+        if kind == "double":
+            encoding += encoding
+        return self.base_path[:i] + encoding + self.base_path[i+1:]
+    
+    def iter_paths(self) -> Iterator[str]:
+        """Yield every unique path variation"""
+        return (path for _, path in self.iter_variants())
+    
+    @property
+    def path_count(self) -> int:
+        """Exact number of paths `iter_paths` yields, computed without generating them"""
+        if self._path_count is None:
+            if "%" in self.base_path:
+                self._path_count = sum(1 for _ in self.iter_variants())
+            else:
+                encodable = sum(1 for char in self.base_path if char != '/')
+                overlap = sum(1 for path in self._structural if self._is_encoded_variant(path))
+                self._path_count = (
+                    len(self._structural) + encodable * len(Config.URL_ENCODINGS) * 2 - overlap
+                )
+        return self._path_count
+    
+    def iter_headers(self) -> Iterator[Dict]:
+        """Yield IP spoofing and rewrite headers"""
+        # IP spoofing headers
+        for header in Config.IP_HEADERS:
+            for value in Config.IP_VALUES:
+                yield {header: value}
+        
+        # URL rewrite headers
+        for header in Config.REWRITE_HEADERS:
+            yield {header: self.base_path}
+    
+    @property
+    def header_count(self) -> int:
+        return len(Config.IP_HEADERS) * len(Config.IP_VALUES) + len(Config.REWRITE_HEADERS)
+    
+    def iter_method_headers(self) -> Iterator[Dict]:
+        """Yield HTTP method override headers"""
+        for header in Config.METHOD_HEADERS:
+            for method in Config.HTTP_METHODS:
+                yield {header: method}
+    
+    @property
+    def method_header_count(self) -> int:
+        return len(Config.METHOD_HEADERS) * len(Config.HTTP_METHODS)
+
+def header_technique(header: Dict) -> str:
+    """Technique label of a single-entry mutation header"""
+    (name, value), = header.items()
+    if name in Config.REWRITE_HEADERS:
+        return f"header:{name}"
+    kind = "method" if name in Config.METHOD_HEADERS else "header"
+    return f"{kind}:{name}={value}"
+
+class MutationSet:
+    """Every single-technique mutation of one base path, built once and shared read-only
+    
+    Variants are (techniques, path) tuples ready to go into a WorkItem, and
+    headers are frozen CIMultiDictProxy objects, which aiohttp sends
+    without normalizing them again. A set too large for the cache is not
+    materialized; its paths are generated lazily instead.
+    """
+    
+    # Size of one (techniques, path) pair; the techniques tuples are shared
+    ENTRY_SIZE = sys.getsizeof(((), ""))
+    
+    def __init__(self, generator: PathGenerator,
+                 freeze: Callable[[Dict[str, str]], Tuple[Tuple[str, ...], Mapping[str, str]]],
+                 materialize: bool = True):
+        self.base_path = generator.base_path
+        self.generator = generator
+        self.headers = tuple(freeze(header) for header in generator.iter_headers())
+        self.method_headers = tuple(freeze(header) for header in generator.iter_method_headers())
+        self.variants: Optional[Tuple[Tuple[Tuple[str, ...], str], ...]] = None
+        self.size = 0
+        if materialize:
+            self.variants = tuple(self._label(technique, path) for technique, path in generator.iter_variants())
+            self.size = sys.getsizeof(self.variants) + sum(
+                self.ENTRY_SIZE + sys.getsizeof(path) for _, path in self.variants
+            )
+        # Combination mode options, keyed by technique label
+        self.path_options = [f"path:{technique}" for technique in generator.path_techniques]
+        self.header_map = {techniques[0]: header for techniques, header in self.headers}
+        self.method_map = {techniques[0]: header for techniques, header in self.method_headers}
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _techniques(technique: str) -> Tuple[str, ...]:
+        return (f"path:{technique}",)
+    
+    def _label(self, technique: str, path: str) -> Tuple[Tuple[str, ...], str]:
+        return self._techniques(technique), path
+    
+    @classmethod
+    def estimate_size(cls, generator: PathGenerator) -> int:
+        """Approximate bytes the materialized variants of a generator would take"""
+        return generator.path_count * (cls.ENTRY_SIZE + sys.getsizeof(generator.base_path) + 8)
+    
+    def iter_variants(self) -> Iterator[Tuple[Tuple[str, ...], str]]:
+        """Yield every unique (techniques, path) pair"""
+        if self.variants is not None:
+            return iter(self.variants)
+        return (self._label(technique, path) for technique, path in self.generator.iter_variants())
+    
+    @property
+    def path_count(self) -> int:
+        return len(self.variants) if self.variants is not None else self.generator.path_count
+    
+    @property
+    def header_count(self) -> int:
+        return len(self.headers)
+    
+    @property
+    def method_header_count(self) -> int:
+        return len(self.method_headers)
+
+class MutationCache:
+    """Process-wide LRU of MutationSets keyed by base path, bounded by approximate memory
+    
+    Frozen header objects are also memoized on their own, so the IP
+    spoofing and method override headers exist once however many base
+    paths are cached.
+    """
+    
+    def __init__(self, max_bytes: int = Config.MUTATION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sets: OrderedDict[str, MutationSet] = OrderedDict()
+        self._headers: Dict[Tuple[str, str], Tuple[Tuple[str, ...], Mapping[str, str]]] = {}
+    
+    def freeze(self, header: Dict[str, str]) -> Tuple[Tuple[str, ...], Mapping[str, str]]:
+        """Shared (techniques, frozen header) pair of a single-entry header dict
+        
+        Rewrite headers carry the base path, so they are left to their
+        MutationSet and leave the cache with it.
+        """
+        (item,) = header.items()
+        frozen = self._headers.get(item)
+        if frozen is None:
+            frozen = (
+                (header_technique(header),),
+                multidict.CIMultiDictProxy(multidict.CIMultiDict(header))
+            )
+            if item[0] not in Config.REWRITE_HEADERS:
+                self._headers[item] = frozen
+        return frozen
+    
+    def get(self, base_path: str) -> MutationSet:
+        """Mutations of a base path, built on first use"""
+        mutations = self._sets.get(base_path)
+        if mutations is not None:
+            self.hits += 1
+            self._sets.move_to_end(base_path)
+            return mutations
+        
+        self.misses += 1
+        generator = PathGenerator(base_path)
+        materialize = MutationSet.estimate_size(generator) <= self.max_bytes
+        mutations = MutationSet(generator, self.freeze, materialize)
+        if materialize:
+            self._sets[base_path] = mutations
+            self.bytes += mutations.size
+            while self.bytes > self.max_bytes and len(self._sets) > 1:
+                _, evicted = self._sets.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+        return mutations
+
+# Shared by every Scanner in the process
+MUTATIONS = MutationCache()
+
+class TechniqueStats:
+    """Running tries and non-baseline hits per technique, shared across targets"""
+    
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.tries: Counter = Counter()
+        self.hits: Counter = Counter()
+        self.rng = rng or random.Random()
+    
+    def record(self, techniques: Iterable[str], hit: bool):
+        """Count one response for every technique that produced it"""
+        for technique in techniques:
+            self.tries[technique] += 1
+            if hit:
+                self.hits[technique] += 1
+    
+    def sample(self, technique: str) -> float:
+        """Thompson sample of the technique's hit rate"""
+        hits = self.hits[technique]
+        return self.rng.betavariate(hits + 1, self.tries[technique] - hits + 1)
+    
+    def pick(self, options: List[str]) -> str:
+        """Choose the option with the best sampled hit rate"""
+        return max(options, key=self.sample)
+
+# Shared by every Scanner in the process
+TECHNIQUE_STATS = TechniqueStats()
+
+class ComboSampler:
+    """Samples path x IP header x method override combinations under a request budget
+    
+    Each axis includes a "none" option and is chosen by Thompson sampling on
+    the run-wide TechniqueStats, so techniques that already produced
+    non-baseline responses are tried in more combinations.
+    """
+    
+    NONE = "none"
+    
+    def __init__(self, mutations: MutationSet, budget: int, stats: TechniqueStats = TECHNIQUE_STATS):
+        self.generator = mutations.generator
+        self.budget = budget
+        self.stats = stats
+        self.paths = mutations.path_options
+        self.headers = mutations.header_map
+        self.methods = mutations.method_map
+        self._header_options = list(self.headers) + [f"header:{self.NONE}"]
+        self._method_options = list(self.methods) + [f"method:{self.NONE}"]
+    
+    def __iter__(self) -> Iterator[Tuple[Tuple[str, ...], str, Optional[Mapping[str, str]]]]:
+        """Yield up to `budget` unique (techniques, path, headers) combinations"""
+        seen: Set[Tuple] = set()
+        sent = 0
+        attempts = 0
+        while sent < self.budget and attempts < Config.COMBO_MAX_ATTEMPTS:
+            techniques = (
+                self.stats.pick(self.paths),
+                self.stats.pick(self._header_options),
+                self.stats.pick(self._method_options)
+            )
+            path = self.generator.variant(techniques[0][len("path:"):], self.stats.rng)
+            header, method = self.headers.get(techniques[1]), self.methods.get(techniques[2])
+            # A single axis reuses its shared frozen header as is
+            headers = {**header, **method} if header and method else header or method
+            key = (path, tuple(sorted(headers.items())) if headers else ())
+            if key in seen or (path == self.generator.base_path and not headers):
+                attempts += 1
+                continue
+            seen.add(key)
+            attempts = 0
+            sent += 1
+            yield techniques, path, headers
+
+class BaselineClassifier:
+    """Reports only responses that differ from a target's baseline cluster"""
+    
+    def __init__(self):
+        self.baseline: List[ResponseFingerprint] = []
+        self.pending = 0
+        self.ready = asyncio.Event()
+    
+    def control_paths(self, path: str) -> List[str]:
+        """Unmodified path plus random paths that should hit any catch-all page"""
+        paths = [path]
+        for i in range(Config.CONTROL_PATHS):
+            token = secrets.token_hex(8)
+            paths.append(f"/{token}" if i % 2 == 0 else f"{path.rstrip('/')}/{token}")
+        self.pending = len(paths)
+        return paths
+    
+    def add_baseline(self, result: RequestResult):
+        """Record one baseline response; the cluster is ready after the last one"""
+        if result.fingerprint and not any(
+            result.fingerprint.matches(known) for known in self.baseline
+        ):
+            self.baseline.append(result.fingerprint)
+        self.pending -= 1
+        if self.pending <= 0:
+            self.ready.set()
+    
+    def is_interesting(self, result: RequestResult) -> bool:
+        """Whether a response falls outside every baseline fingerprint"""
+        if result.error or not result.fingerprint:
+            return True
+        return not any(result.fingerprint.matches(known) for known in self.baseline)
+
+async def aiterate(items: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    """Iterate a plain or an async iterable from async code"""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+class Scheduler:
+    """Dispatches work items under a global and a per-host in-flight cap"""
+    
+    def __init__(self, request_manager: "RequestManager", concurrency: int = 10,
+                 per_host: int = Config.PER_HOST_LIMIT,
+                 checkpoint: Optional[CheckpointStore] = None):
+        self.request_manager = request_manager
+        self.checkpoint = checkpoint
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, min(per_host, self.concurrency))
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        # Requests holding or waiting for each host's slot; idle hosts are dropped
+        self._host_users: Counter = Counter()
+        request_manager.slots = self._slots
+        # Extra workers keep the global cap busy while others wait on rate limits or backoff
+        self.workers = self.concurrency * 2
+    
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        """Get (or create) the semaphore limiting requests to one host; pair with _leave_host"""
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        self._host_users[host] += 1
+        return slot
+    
+    def _leave_host(self, host: str):
+        """Drop the host's semaphore once no request holds or waits for it"""
+        self._host_users[host] -= 1
+        if not self._host_users[host]:
+            del self._host_users[host]
+            del self._host_slots[host]
+    
+    @property
+    def window(self) -> int:
+        """Number of targets to interleave so the global cap can be filled"""
+        return max(1, self.concurrency // self.per_host) * 2
+    
+    async def run(self, items: Union[Iterable[WorkItem], AsyncIterable[WorkItem]],
+                  on_result: Optional[Callable[[WorkItem, RequestResult], Awaitable[None]]] = None):
+        """Pull work items lazily and dispatch them until the source is exhausted
+        
+        An asynchronous source may wait for results before yielding more items.
+        """
+        on_result = on_result or dispatch_result
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers)
+        
+        async def feed():
+            try:
+                async for item in aiterate(items):
+                    await queue.put(item)
+            finally:
+                for _ in range(self.workers):
+                    await queue.put(None)
+        
+        async def work():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if self.checkpoint and item.key in self.checkpoint:
+                    result = await self.checkpoint.replay(item.key)
+                    if result:
+                        await on_result(item, result)
+                        continue
+                # The global slot is taken inside make_request, only around the wire time
+                queued = time.monotonic()
+                try:
+                    async with self._host_slot(item.host):
+                        result = await self.request_manager.make_request(
+                            item.method, item.target, item.headers, item.phase, queued
+                        )
+                finally:
+                    self._leave_host(item.host)
+                if result:
+                    await on_result(item, result)
+        
+        await asyncio.gather(feed(), *(work() for _ in range(self.workers)))
+
+async def dispatch_result(item: WorkItem, result: RequestResult):
+    """Route a result back to the scanner that produced the work item"""
+    if item.scanner:
+        await item.scanner.handle_result(item, result)
+
+class Scanner:
+    """Main scanner class that orchestrates the testing process"""
+    
+    def __init__(self, url: str, path: str, request_manager: Optional["RequestManager"] = None,
+                 sink: Optional[SinkPipeline] = None,
+                 checkpoint: Optional[CheckpointStore] = None,
+                 combo_budget: int = 0, stats: TechniqueStats = TECHNIQUE_STATS,
+                 display: Optional[DisplayManager] = None,
+                 baseline: Optional[RequestResult] = None,
+                 history: Optional[TechniqueHistory] = None, fast_budget: int = 0,
+                 wire_lines: Optional[WireLines] = None):
+        self.url = url.rstrip("/")
+        self.path = path
+        self.mutations = MUTATIONS.get(path)
+        self.path_generator = self.mutations.generator
+        self.request_manager = request_manager or RequestManager()
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.combo_budget = combo_budget
+        self.stats = stats
+        self.display = display or DisplayManager()
+        self.history = history
+        self.fast_budget = fast_budget
+        # Kind of server, known once a baseline response is in
+        self.fingerprint: Optional[str] = None
+        self.classifier = BaselineClassifier()
+        self.controls = self.classifier.control_paths(path)
+        if baseline is not None:
+            # The pre-flight request already fetched the unmodified path
+            self.controls.remove(path)
+            self.classifier.add_baseline(baseline)
+            if not baseline.error:
+                self.fingerprint = server_fingerprint(baseline.fingerprint)
+        if combo_budget:
+            mutations = combo_budget
+        else:
+            mutations = (
+                self.mutations.path_count +
+                self.mutations.header_count +
+                self.mutations.method_header_count
+            )
+            if fast_budget:
+                mutations = min(mutations, fast_budget)
+        self.mutation_total = mutations
+        self.display.total_requests = (
+            len(self.controls) +  # baseline requests
+            1 +  # POST request
+            mutations
+        )
+        self.done = 0
+        # Request lines already queued for this host by any scanner, as the
+        # engine will actually write them
+        self.wire_target = self.request_manager.session_factory.wire_target
+        self.wire_lines = wire_lines or WireLines()
+        self._host = host_of(self.url)
+        self._seen: Optional[ScalableBloomFilter] = self.wire_lines.acquire(self._host)
+        if baseline is not None:
+            # Including the pre-flight one, so the unmodified path is not sent again
+            self._first_on_wire("GET", path)
+    
+    @cached_property
+    def domain(self) -> str:
+        """Domain naming the output file, looked up when the first result is written"""
+        return split_host(host_of(self.url))[0]
+    
+    def _first_on_wire(self, method: str, path: str, headers: Optional[Mapping[str, str]] = None) -> bool:
+        """Whether a request differs on the wire from every one already queued for this host"""
+        line = f"{method} {self.wire_target(self.url + path)}"
+        if headers:
+            line += "".join(f"\n{name}: {value}" for name, value in sorted(headers.items()))
+        return self._seen.add(line)
+    
+    def work_items(self) -> Iterator[WorkItem]:
+        """Yield every request of this scan, one at a time"""
+        try:
+            yield from self._work_items()
+        finally:
+            if self._seen is not None:
+                self._seen = None
+                self.wire_lines.release(self._host)
+    
+    def _work_items(self) -> Iterator[WorkItem]:
+        self.display.print_target_info(self.url, self.path)
+        
+        # Baseline: the unmodified path and random control paths
+        for path in self.controls:
+            self._first_on_wire("GET", path)
+            yield WorkItem(self.url, path, phase="baseline", scanner=self)
+        
+        # Test POST request
+        if self._first_on_wire("POST", self.path):
+            yield WorkItem(self.url, self.path, "POST", phase="method",
+                           techniques=("method:POST",), scanner=self)
+        else:
+            self.display.adjust_total(-1)
+        
+        if self.combo_budget:
+            yield from self._combo_items()
+            return
+        
+        if self.history is not None and self.history.tries:
+            mutations = self._ranked()
+        else:
+            mutations = (mutation for _, mutation in self._unique(self._mutations()))
+        
+        # Stop at the --fast budget
+        sent = 0
+        for phase, techniques, path, headers in mutations:
+            if self.fast_budget and sent >= self.fast_budget:
+                break
+            sent += 1
+            yield WorkItem(self.url, path, headers=headers, phase=phase,
+                           techniques=techniques, scanner=self)
+        if sent < self.mutation_total:
+            self.display.adjust_total(sent - self.mutation_total)
+            self._finish_if_done()
+    
+    def _unique(self, mutations: Iterable[Tuple], skipped: Optional[Set[int]] = None) -> Iterator[Tuple[int, Tuple]]:
+        """Numbered mutations the engine would not send identically to an earlier request
+        
+        The numbers of the others are added to `skipped`.
+        """
+        for index, mutation in enumerate(mutations):
+            if self._first_on_wire("GET", mutation[2], mutation[3]):
+                yield index, mutation
+            elif skipped is not None:
+                skipped.add(index)
+    
+    def _ranked(self) -> Iterator[Tuple[str, Tuple[str, ...], str, Optional[Mapping[str, str]]]]:
+        """Unique mutations, the most promising first
+        
+        Rates come from earlier scans of this kind of server (or of every
+        server while no baseline has answered yet). Only the top --fast
+        budget, or RANKED_PREFIX without one, is picked with a bounded heap,
+        and ties keep phase order; the rest follow lazily in phase order.
+        """
+        score = self.history.scorer(self.fingerprint)
+        skipped: Set[int] = set()
+        ranked = heapq.nlargest(self.fast_budget or Config.RANKED_PREFIX, self._unique(self._mutations(), skipped),
+                                key=lambda entry: score(entry[1][1]))
+        for _, mutation in ranked:
+            yield mutation
+        if self.fast_budget:
+            return
+        skipped.update(index for index, _ in ranked)
+        for index, mutation in enumerate(self._mutations()):
+            if index not in skipped:
+                yield mutation
+    
+    def _mutations(self) -> Iterator[Tuple[str, Tuple[str, ...], str, Optional[Mapping[str, str]]]]:
+        """(phase, techniques, path, headers) of every single-technique mutation, phase by phase"""
+        # Path variations
+        for techniques, path in self.mutations.iter_variants():
+            yield "path", techniques, path, None
+        
+        # Headers
+        for techniques, header in self.mutations.headers:
+            yield "header", techniques, self.path, header
+        
+        # Method override headers
+        for techniques, header in self.mutations.method_headers:
+            yield "method-override", techniques, self.path, header
+    
+    def _combo_items(self) -> Iterator[WorkItem]:
+        """Yield budgeted cross-technique combinations, sampled as results come in"""
+        sent = 0
+        for techniques, path, headers in ComboSampler(self.mutations, self.combo_budget, self.stats):
+            if not self._first_on_wire("GET", path, headers):
+                continue
+            sent += 1
+            yield WorkItem(self.url, path, headers=headers, phase="combo",
+                           techniques=techniques, scanner=self)
+        
+        # The combination space can run out before the budget does
+        if sent < self.combo_budget:
+            self.display.adjust_total(sent - self.combo_budget)
+            self._finish_if_done()
+    
+    def _finish_if_done(self):
+        """Display the summary once every request has completed"""
+        if self.done == self.display.total_requests:
+            self.display.print_summary()
+    
+    async def handle_result(self, item: WorkItem, result: RequestResult):
+        """Classify and display a completed request, finishing the scan after the last one"""
+        if item.phase == "baseline":
+            self.classifier.add_baseline(result)
+            if self.fingerprint is None and not result.error:
+                self.fingerprint = server_fingerprint(result.fingerprint)
+        else:
+            # Baseline items are dispatched first, so this wait is short
+            await self.classifier.ready.wait()
+            if result.interesting is None:
+                result.interesting = self.classifier.is_interesting(result)
+            self.display.print_result(result, result.interesting)
+            if not result.error:
+                self.stats.record(item.techniques, result.interesting)
+            if not result.error and not result.replayed:
+                if self.history is not None:
+                    self.history.record(self.fingerprint or TechniqueHistory.UNKNOWN,
+                                        item.techniques, result.interesting)
+                if self.sink and result.interesting:
+                    self.sink.submit(self.domain, dict(result.to_dict(), phase=item.phase))
+                if self.checkpoint:
+                    self.checkpoint.record(item.key, result)
+        self.done += 1
+        self.display.print_progress(self.done, self.display.total_requests)
+        self._finish_if_done()
+    
+    async def scan(self, concurrency: int = 10):
+        """Perform the scanning process"""
+        async with self.request_manager:
+            scheduler = Scheduler(self.request_manager, concurrency)
+            await scheduler.run(self.work_items())
+
+class Preflight:
+    """Cheap first stage that decides which url x dir pairs get the full mutation set
+    
+    Hosts are checked with one TCP connect (DNS included) as URLs arrive,
+    and every pair on a live host gets a single request for its
+    unmodified path. Only pairs answering with a gated status become
+    Scanners, which reuse that response as their first baseline. Pairs
+    are probed lazily, a few at a time, so the scan starts immediately.
+    Without statuses nothing is checked and every pair becomes a Scanner.
+    Without `check_hosts`, unreachable hosts only show up as probe errors.
+    
+    Pairs may come from an async iterable, so the scan starts on the first
+    target while a long list is still being read.
+    """
+    
+    def __init__(self, pairs: Union[Iterable[Tuple[str, str]], AsyncIterable[Tuple[str, str]]],
+                 make_scanner: Callable[..., "Scanner"],
+                 statuses: Optional[Iterable[int]] = Config.GATE_STATUSES,
+                 concurrency: int = 10, window: int = 2, check_hosts: bool = True):
+        self.pairs = pairs
+        self.make_scanner = make_scanner
+        self.statuses = frozenset(statuses) if statuses is not None else None
+        self.check_hosts = check_hosts
+        self.concurrency = max(1, concurrency)
+        self.window = max(1, window)
+        self.requests = 0
+        self.dead_hosts = 0
+        # Skipped pairs by reason: "unreachable", "error" or the status code
+        self.skipped: Counter = Counter()
+        # Checks in progress, and the verdicts of recently checked hosts
+        self._checks: Dict[str, asyncio.Future] = {}
+        self._verdicts: OrderedDict[str, bool] = OrderedDict()
+        self._live: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        self._ready: deque = deque()
+        self._outstanding = 0
+        self._hosts_done = False
+        self._changed = asyncio.Event()
+    
+    async def _connect(self, url: str) -> bool:
+        scheme, authority, _ = split_target(url)
+        host, port = split_authority(scheme, authority)
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), Config.PREFLIGHT_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            self.dead_hosts += 1
+            return False
+        writer.close()
+        return True
+    
+    async def _reachable(self, url: str) -> bool:
+        """Whether the host of a URL accepts connections
+        
+        Each host is checked once while its verdict is among the
+        HOST_STATE_LIMIT most recent ones.
+        """
+        host = host_of(url)
+        verdict = self._verdicts.get(host)
+        if verdict is not None:
+            self._verdicts.move_to_end(host)
+            return verdict
+        check = self._checks.get(host)
+        if check is None:
+            check = self._checks[host] = asyncio.ensure_future(self._connect(url))
+            check.add_done_callback(lambda _: self._remember(host))
+        return await check
+    
+    def _remember(self, host: str):
+        """Move a finished check to the bounded verdicts"""
+        check = self._checks.pop(host)
+        if check.cancelled() or check.exception() is not None:
+            return
+        self._verdicts[host] = check.result()
+        if len(self._verdicts) > Config.HOST_STATE_LIMIT:
+            self._verdicts.popitem(last=False)
+    
+    async def _check_hosts(self):
+        """Queue the pairs on live hosts, checking up to `concurrency` hosts at a time"""
+        slots = asyncio.Semaphore(self.concurrency)
+        
+        async def check(url: str, dir: str):
+            try:
+                if self.statuses is None or not self.check_hosts or await self._reachable(url):
+                    await self._live.put((url, dir))
+                else:
+                    self.skipped["unreachable"] += 1
+            finally:
+                slots.release()
+                self._changed.set()
+        
+        checks: Set[asyncio.Future] = set()
+        try:
+            async for url, dir in aiterate(self.pairs):
+                await slots.acquire()
+                task = asyncio.ensure_future(check(url, dir))
+                checks.add(task)
+                task.add_done_callback(checks.discard)
+            if checks:
+                await asyncio.gather(*checks)
+        finally:
+            self._hosts_done = True
+            self._changed.set()
+    
+    async def items(self) -> AsyncIterator[WorkItem]:
+        """Yield probes and the work items of the scanners they let through
+        
+        New pairs are only probed while fewer than `window` scanners are
+        active, so memory stays bounded however long the URL list is.
+        """
+        hosts = asyncio.ensure_future(self._check_hosts())
+        active: deque = deque()
+        try:
+            while True:
+                while self._ready and len(active) < self.window:
+                    active.append(iter(self._ready.popleft().work_items()))
+                
+                if (self._outstanding < self.concurrency and len(active) + len(self._ready) < self.window
+                        and not self._live.empty()):
+                    url, dir = self._live.get_nowait()
+                    if self.statuses is None:
+                        self._ready.append(self.make_scanner(url, dir))
+                    else:
+                        self._outstanding += 1
+                        yield WorkItem(url, dir, phase="preflight", scanner=self)
+                    continue
+                
+                if active:
+                    source = active.popleft()
+                    item = next(source, None)
+                    if item is not None:
+                        yield item
+                        active.append(source)
+                    continue
+                
+                if self._hosts_done and self._live.empty() and not self._outstanding and not self._ready:
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            hosts.cancel()
+    
+    async def handle_result(self, item: WorkItem, result: RequestResult):
+        """Gate one pair on the status of its unmodified path"""
+        self._outstanding -= 1
+        self.requests += 1
+        if result.error:
+            self.skipped["error"] += 1
+        elif result.status_code in self.statuses:
+            self._ready.append(self.make_scanner(item.url, item.path, result))
+        else:
+            self.skipped[result.status_code] += 1
+        self._changed.set()
+
+class ArgumentParser:
+    """Handles command line argument parsing and validation"""
+    
+    def __init__(self):
+        self.parser = argparse.ArgumentParser(
+            description="403 Bypass Tool - A  tool for bypassing 403 Forbidden responses"
         )
         self._setup_arguments()
     
@@ -443,7 +3579,7 @@ class ArgumentParser:
         )
         self.parser.add_argument(
             "-U", "--urllist", type=str,
-            help="Path to list of URLs, ex: urllist.txt"
+            help="Path to list of URLs, or - for stdin; read as the scan runs, ex: urllist.txt"
         )
         self.parser.add_argument(
             "-d", "--dir", type=str,
@@ -452,82 +3588,945 @@ class ArgumentParser:
         )
         self.parser.add_argument(
             "-D", "--dirlist", type=str,
-            help="Path to list of directories, ex: dirlist.txt"
+            help="Path to list of directories, or - for stdin, ex: dirlist.txt"
         )
         self.parser.add_argument(
             "-t", "--threads", type=int,
-            help="Number of concurrent threads (default: 10)",
+            help="Maximum number of requests in flight across all targets (default: 10)",
             default=10
         )
+        self.parser.add_argument(
+            "--per-host", type=int,
+            help=f"Maximum number of requests in flight per host (default: {Config.PER_HOST_LIMIT})",
+            default=Config.PER_HOST_LIMIT
+        )
+        self.parser.add_argument(
+            "--keepalive", type=float,
+            help=f"Seconds to keep idle connections open (default: {Config.KEEPALIVE_TIMEOUT})",
+            default=Config.KEEPALIVE_TIMEOUT
+        )
+        self.parser.add_argument(
+            "--dns-ttl", type=int,
+            help=f"Seconds to cache DNS lookups (default: {Config.DNS_CACHE_TTL})",
+            default=Config.DNS_CACHE_TTL
+        )
+        self.parser.add_argument(
+            "-q", "--quiet", action="store_true",
+            help="Only print responses that differ from the baseline, and the summary"
+        )
+        self.parser.add_argument(
+            "--suffix-list", type=str,
+            help="Local public suffix list file (default: snapshot bundled with tldextract, no network)"
+        )
+        self.parser.add_argument(
+            "--workers", type=int,
+            help="Number of processes to shard the scan across; --threads applies per worker, per-host limits are split between them (default: 1)",
+            default=1
+        )
+        self.parser.add_argument(
+            "--rate", type=float,
+            help="Initial requests per second per host, adapted during the scan "
+                 "(default: uncapped until the host throttles or slows down)"
+        )
+        self.parser.add_argument(
+            "--max-rate", type=float,
+            help="Upper bound on requests per second per host (default: none)"
+        )
+        self.parser.add_argument(
+            "--engine", type=str, choices=Config.ENGINES,
+            help="HTTP client: aiohttp (normalizes URLs), raw (sends every path byte for byte) "
+                 "or http2 (multiplexed HTTP/2 with HTTP/1.1 fallback, needs httpx[http2]) "
+                 "(default: aiohttp)",
+            default="aiohttp"
+        )
+        self.parser.add_argument(
+            "--h2c", action="store_true",
+            help="With --engine http2, speak cleartext HTTP/2 to http:// targets "
+                 "(prior knowledge, falls back to HTTP/1.1 per host)"
+        )
+        self.parser.add_argument(
+            "--max-body", type=int,
+            help=f"Maximum response bytes to read per request (default: {Config.MAX_BODY_BYTES})",
+            default=Config.MAX_BODY_BYTES
+        )
+        self.parser.add_argument(
+            "-o", "--output", type=str, choices=Config.OUTPUT_FORMATS,
+            help="Format of the per-target result files (default: txt)",
+            default="txt"
+        )
+        self.parser.add_argument(
+            "--output-dir", type=str,
+            help="Directory for result files (default: current directory)",
+            default="."
+        )
+        self.parser.add_argument(
+            "--gate", type=str, metavar="STATUSES",
+            help="Probe each host and path first and only run the mutation phases where the path answers "
+                 f"with one of these comma separated statuses, or 'off' to scan everything "
+                 f"(default: {','.join(map(str, Config.GATE_STATUSES))})",
+            default=",".join(map(str, Config.GATE_STATUSES))
+        )
+        self.parser.add_argument(
+            "--combo", type=int, metavar="BUDGET",
+            help="Replace the single-technique phases with BUDGET sampled combinations per target",
+            default=0
+        )
+        self.parser.add_argument(
+            "--history", type=str, metavar="FILE", nargs="?", const=str(Config.HISTORY_FILE),
+            help="Keep technique hit rates per server fingerprint in this SQLite file across runs and send "
+                 f"the most promising mutations first (default file: {Config.HISTORY_FILE})",
+            default=None
+        )
+        self.parser.add_argument(
+            "--fast", type=int, metavar="BUDGET", nargs="?", const=Config.FAST_BUDGET,
+            help=f"Only send the BUDGET most promising mutations per target (default budget: {Config.FAST_BUDGET})",
+            default=0
+        )
+        self.parser.add_argument(
+            "--checkpoint", type=str,
+            help="File recording finished requests (default: "
+                 f"{Config.CHECKPOINT_FILE.format(digest='<hash of the inputs>')})"
+        )
+        self.parser.add_argument(
+            "--resume", action="store_true",
+            help="Skip requests already recorded in the checkpoint and replay their results"
+        )
+        self.parser.add_argument(
+            "--coordinate", type=int, metavar="PORT",
+            help="Hand the scan's requests out to remote workers (--join) over HTTP on PORT instead of "
+                 "sending them; --threads caps the requests leased out across all workers"
+        )
+        self.parser.add_argument(
+            "--join", type=str, metavar="URL",
+            help="Run as a remote worker of the coordinator at URL, ex: http://10.0.0.5:8700 "
+                 "(--threads applies to this worker; engine and rate settings come from the coordinator)"
+        )
+        self.parser.add_argument(
+            "--bind", type=str, metavar="HOST",
+            help=f"Address the coordinator listens on; use 0.0.0.0 for workers on other machines "
+                 f"(default: {Config.COORDINATOR_HOST})",
+            default=Config.COORDINATOR_HOST
+        )
+        self.parser.add_argument(
+            "--token", type=str,
+            help="Shared secret between coordinator and workers (default: generated by the coordinator)"
+        )
+        self.parser.add_argument(
+            "--metrics-port", type=int, metavar="PORT",
+            help=f"Serve Prometheus metrics on http://{Config.METRICS_HOST}:PORT/metrics during the scan "
+                 "(worker N uses PORT+N)"
+        )
+        self.parser.add_argument(
+            "--profile", type=str, metavar="FILE",
+            help="Profile the scan with cProfile, save the pstats data to FILE (FILE.N per worker) "
+                 "and print the hottest calls"
+        )
     
-    def parse(self) -> Tuple[List[str], List[str]]:
-        """Parse and validate arguments"""
-        args = self.parser.parse_args()
+    def parse(self, argv: Optional[List[str]] = None) -> Tuple[Optional[UrlStream], Optional[List[str]], argparse.Namespace]:
+        """Parse and validate arguments (from sys.argv unless `argv` is given)
+        
+        A --join worker gets no URLs or directories.
+        """
+        args = self.parser.parse_args(argv)
         
-        # Validate and collect URLs
+        if args.join:
+            # Targets and scan settings come from the coordinator
+            if args.coordinate:
+                self.parser.error("--join and --coordinate cannot be combined")
+            if not args.token:
+                self.parser.error("--join requires the --token printed by the coordinator")
+            import validators
+            if not validators.url(args.join):
+                self.parser.error("--join must be the coordinator URL, ex: http://10.0.0.5:8700")
+            if args.threads < 1 or args.workers < 1:
+                self.parser.error("--threads and --workers must be at least 1")
+            return None, None, args
+        
+        # Validate URLs; a list is streamed during the scan
         urls = self._process_urls(args.url, args.urllist)
+        if not args.url and args.urllist == "-" and not args.dir and args.dirlist == "-":
+            self.parser.error("Only one of --urllist and --dirlist can be read from stdin")
         
         # Validate and collect directories
         dirs = self._process_dirs(args.dir, args.dirlist)
         
-        return urls, dirs
-    
-    def _process_urls(self, url: Optional[str], urllist: Optional[str]) -> List[str]:
-        """Process URL arguments"""
-        urls = []
+        if args.threads < 1 or args.per_host < 1 or args.workers < 1:
+            self.parser.error("--threads, --per-host and --workers must be at least 1")
+        if args.max_body < 0:
+            self.parser.error("--max-body must not be negative")
+        if (args.rate is not None and args.rate <= 0) or (args.max_rate is not None and args.max_rate <= 0):
+            self.parser.error("--rate and --max-rate must be positive")
+        if args.combo < 0:
+            self.parser.error("--combo must not be negative")
+        if args.fast < 0:
+            self.parser.error("--fast must not be negative")
+        if args.fast and args.combo:
+            self.parser.error("--fast and --combo cannot be combined; --combo already has a budget")
+        if args.gate.strip().lower() == "off":
+            args.gate = None
+        else:
+            try:
+                args.gate = sorted({int(code) for code in args.gate.split(",") if code.strip()})
+            except ValueError:
+                self.parser.error("--gate must be a comma separated list of status codes, or 'off'")
+            if not args.gate:
+                self.parser.error("--gate must name at least one status code, or be 'off'")
+        if args.engine == "http2" and not all(
+            importlib.util.find_spec(name) for name in ("httpx", "h2")
+        ):
+            self.parser.error("--engine http2 needs httpx with HTTP/2 support: pip install 'httpx[http2]'")
+        if args.h2c and args.engine != "http2":
+            self.parser.error("--h2c requires --engine http2")
+        if args.metrics_port is not None and not 0 < args.metrics_port < 65536:
+            self.parser.error("--metrics-port must be between 1 and 65535")
+        if args.coordinate is not None:
+            if not 0 < args.coordinate < 65536:
+                self.parser.error("--coordinate must be a port between 1 and 65535")
+            if args.workers > 1:
+                self.parser.error("--coordinate runs in one process; add capacity by starting more --join workers")
+            args.token = args.token or secrets.token_urlsafe(12)
+        # Tags the checkpoint rows of this run, which worker processes share
+        args.run_id = secrets.token_hex(8)
+        args.checkpoint = args.checkpoint or self._checkpoint_path(args)
         
+        return urls, dirs, args
+    
+    @staticmethod
+    def _checkpoint_path(args: argparse.Namespace) -> str:
+        """Default checkpoint of a scan, so running it again resumes its own store"""
+        def source(path: Optional[str]) -> Optional[str]:
+            return os.path.abspath(path) if path and path != "-" else path
+        inputs = [args.url, source(args.urllist), args.dir, source(args.dirlist),
+                  args.engine, args.combo, args.fast, args.gate]
+        digest = hashlib.blake2b(json.dumps(inputs).encode(), digest_size=6).hexdigest()
+        return Config.CHECKPOINT_FILE.format(digest=digest)
+    
+    def _process_urls(self, url: Optional[str], urllist: Optional[str]) -> UrlStream:
+        """Process URL arguments; a URL list ("-" for stdin) is only read during the scan"""
         if url:
+            import validators
             if not validators.url(url):
                 self.parser.error("Invalid URL provided")
-            urls.append(url.rstrip("/"))
-        elif urllist:
-            if not os.path.exists(urllist):
+            return UrlStream([url])
+        if urllist:
+            if urllist != "-" and not os.path.isfile(urllist):
                 self.parser.error("URL list file does not exist")
-            with open(urllist) as f:
-                urls = [line.strip().rstrip("/") for line in f if line.strip()]
-        else:
-            self.parser.error("Either --url or --urllist must be provided")
-        
-        return urls
+            return UrlStream.open(urllist)
+        self.parser.error("Either --url or --urllist must be provided")
     
     def _process_dirs(self, dir: Optional[str], dirlist: Optional[str]) -> List[str]:
         """Process directory arguments"""
         dirs = []
         
         if dir:
-            if not dir.startswith("/"):
-                dir = "/" + dir
-            if dir.endswith("/") and dir != "/":
-                dir = dir.rstrip("/")
-            dirs.append(dir)
+            dirs.append(self._normalize_dir(dir))
         elif dirlist:
-            if not os.path.exists(dirlist):
+            if dirlist != "-" and not os.path.isfile(dirlist):
                 self.parser.error("Directory list file does not exist")
-            with open(dirlist) as f:
-                dirs = [line.strip() for line in f if line.strip()]
+            # Every URL is paired with every directory, so the list is kept in memory (without duplicates)
+            dirs = list(dict.fromkeys(
+                self._normalize_dir(line.strip()) for line in read_lines(dirlist) if line.strip()
+            ))
         else:
             dirs = ["/"]
         
         return dirs
+    
+    @staticmethod
+    def _normalize_dir(dir: str) -> str:
+        if not dir.startswith("/"):
+            dir = "/" + dir
+        if dir.endswith("/") and dir != "/":
+            dir = dir.rstrip("/")
+        return dir
 
-async def main():
-    """Main entry point"""
-    display = DisplayManager()
-    display.print_banner()
+def build_session_factory(args: argparse.Namespace) -> SessionFactory:
+    """Connection pool of the engine chosen in `args`"""
+    # Each process runs one scan, so the default aiohttp engine keeps the shared factory
+    session_factory = SESSIONS if args.engine == "aiohttp" else ENGINES[args.engine]()
+    session_factory.configure(
+        limit=args.threads,
+        limit_per_host=args.per_host,
+        keepalive_timeout=args.keepalive,
+        dns_cache_ttl=args.dns_ttl
+    )
+    if args.h2c:
+        session_factory.prior_knowledge = True
+    return session_factory
+
+def build_request_manager(args: argparse.Namespace) -> RequestManager:
+    """RequestManager of one process, with rate control and metrics"""
+    return RequestManager(build_session_factory(args), max_body=args.max_body,
+                          rate_controller=HostRateController(args.rate, args.max_rate),
+                          metrics=ScanMetrics())
+
+def request_stats(request_manager: RequestManager) -> Dict:
+    """Pool and retry counters and stage timings of one process, as merged by the Renderer"""
+    factory = request_manager.session_factory
+    rate_controller = request_manager.rate_controller
+    metrics = request_manager.metrics
+    return {
+        "created": factory.connections_created,
+        "reused": factory.connections_reused,
+        "http2": factory.http2_requests,
+        "retries": request_manager.retries,
+        "throttled": rate_controller.throttled if rate_controller else 0,
+        "timings": {stage: histogram.to_dict() for stage, histogram in metrics.stage_totals().items()}
+                   if metrics else {}
+    }
+
+def url_dir_pairs(urls: Iterable[str], dirs: List[str]) -> Iterator[Tuple[str, str]]:
+    """Every url x dir pair, URL by URL"""
+    for url in urls:
+        for dir in dirs:
+            yield url, dir
+
+async def run_scan(urls: Iterable[str], dirs: List[str], args: argparse.Namespace,
+                   channel) -> Dict[str, int]:
+    """Scan every url x dir pair in this process, sending display events to `channel`
+    
+    `urls` is read in a background thread unless it is already in memory.
+    """
+    pairs = url_dir_pairs(urls, dirs)
+    if not isinstance(urls, (list, tuple)):
+        pairs = BackgroundIterator(pairs)
+    return await scan_pairs(pairs, args, channel)
+
+async def scan_pairs(pairs: Union[Iterable[Tuple[str, str]], AsyncIterable[Tuple[str, str]]],
+                     args: argparse.Namespace, channel, worker: bool = False) -> Dict[str, int]:
+    """Scan (url, dir) pairs in this process, sending display events to `channel`
+    
+    With --coordinate, requests are sent by remote workers instead, whose
+    final counters are forwarded to `channel`. Returns the pool and retry
+    counters and the stage timings of this process.
+    """
+    sink = SinkPipeline(SINKS[args.output](), args.output_dir)
+    # Worker processes share a checkpoint the parent has already prepared
+    checkpoint = CheckpointStore(args.checkpoint, resume=args.resume, owner=not worker,
+                                 run_id=args.run_id)
+    history = TechniqueHistory(args.history) if args.history else None
+    broker: Optional[LeaseBroker] = None
+    if args.coordinate:
+        broker = LeaseBroker()
+        request_manager = RemoteRequestManager(broker, build_session_factory(args), metrics=ScanMetrics())
+    else:
+        request_manager = build_request_manager(args)
+    async with contextlib.AsyncExitStack() as stack:
+        if args.metrics_port:
+            await stack.enter_async_context(
+                MetricsServer(request_manager.metrics, request_manager, args.metrics_port)
+            )
+        if broker:
+            await stack.enter_async_context(Coordinator(broker, args, args.coordinate, args.bind))
+        await stack.enter_async_context(request_manager)
+        await stack.enter_async_context(sink)
+        await stack.enter_async_context(checkpoint)
+        if history:
+            await stack.enter_async_context(history)
+        scheduler = Scheduler(request_manager, args.threads, args.per_host, checkpoint)
+        
+        wire_lines = WireLines()
+        
+        def make_scanner(url: str, dir: str, baseline: Optional[RequestResult] = None) -> Scanner:
+            return Scanner(url, dir, request_manager, sink, checkpoint, args.combo,
+                           display=ForwardingDisplay(channel), baseline=baseline,
+                           history=history, fast_budget=args.fast, wire_lines=wire_lines)
+        
+        # Scanners are created lazily so only the active window lives in memory.
+        # Remote workers may see hosts the coordinator cannot, so only they connect
+        preflight = Preflight(pairs, make_scanner, args.gate, args.threads, scheduler.window,
+                              check_hosts=broker is None)
+        await scheduler.run(preflight.items())
+        if broker:
+            await broker.drain()
+            for stats in broker.worker_stats:
+                channel.send("stats", stats)
+    
+    return {
+        **request_stats(request_manager),
+        "preflight": preflight.requests,
+        "dead_hosts": preflight.dead_hosts,
+        **{f"skipped:{reason}": count for reason, count in preflight.skipped.items()},
+        **(broker.stats() if broker else {})
+    }
+
+def queued_pairs(pairs: "multiprocessing.Queue") -> Iterator[Tuple[str, str]]:
+    """(url, dir) pairs sent to a worker in batches, up to the None sentinel"""
+    for batch in iter(pairs.get, None):
+        yield from batch
+
+async def run_worker_scan(pairs: "multiprocessing.Queue", args: argparse.Namespace,
+                          events: "multiprocessing.Queue"):
+    """Scan one shard, streaming display events and final counters to the parent"""
+    async with WorkerChannel(events) as channel:
+        stats = await scan_pairs(BackgroundIterator(queued_pairs(pairs)), args, channel, worker=True)
+        channel.send("stats", stats)
+
+def run_worker(pairs: "multiprocessing.Queue", args: argparse.Namespace, events: "multiprocessing.Queue"):
+    """Worker process entry point, with its own event loop and connection pool"""
+    with profiled(args.profile, report=False):
+        asyncio.run(run_worker_scan(pairs, args, events))
+
+def worker_args(args: argparse.Namespace, index: int, shares: int = 1) -> argparse.Namespace:
+    """Arguments of one worker process: its own metrics port and profile file
+    
+    Hosts are scanned by all `shares` workers at once, so each gets that
+    share of the per-host limits.
+    """
+    args = argparse.Namespace(**vars(args))
+    if args.metrics_port:
+        args.metrics_port += index
+    if args.profile:
+        args.profile = f"{args.profile}.{index}"
+    share_host_limits(args, shares)
+    return args
+
+def share_host_limits(args: argparse.Namespace, shares: int):
+    """Cut the per-host limits of `args` to one of `shares` processes sending to the same hosts"""
+    if shares > 1:
+        args.per_host = max(1, args.per_host // shares)
+        if args.rate:
+            args.rate /= shares
+        if args.max_rate:
+            args.max_rate /= shares
+
+class ShardedScan:
+    """Spreads the url x dir work over several processes and aggregates their output
+    
+    Pairs are dealt out round-robin, so one large host is scanned by every
+    worker, each within its share of the per-host limits. They are
+    streamed to the workers while the list is still being read. A worker
+    that exits with an error fails the whole scan.
+    """
+    
+    def __init__(self, urls: Iterable[str], dirs: List[str], args: argparse.Namespace):
+        self.urls = urls
+        self.dirs = dirs
+        self.args = args
+        self.workers = args.workers
+        self.renderer = Renderer(quiet=args.quiet)
+        self._feed_error: Optional[BaseException] = None
+    
+    @staticmethod
+    def _put(pairs: "multiprocessing.Queue", batch: Optional[List[Tuple[str, str]]],
+             process: multiprocessing.Process):
+        """Hand a batch to a worker, waiting for room only while the worker is alive"""
+        while True:
+            try:
+                pairs.put(batch, timeout=Config.WORKER_POLL)
+                return
+            except queue.Full:
+                if not process.is_alive():
+                    raise RuntimeError(f"Worker process {process.pid} exited with code {process.exitcode}")
+    
+    def feed(self, queues: List["multiprocessing.Queue"], processes: List[multiprocessing.Process]):
+        """Deal every url x dir pair out to the workers, in batches
+        
+        A batch also goes out once it has waited a flush interval, so each
+        worker starts on its first pair while the rest of the list is read.
+        """
+        batches: List[List[Tuple[str, str]]] = [[] for _ in queues]
+        flushed = [0.0] * len(queues)
+        try:
+            for index, pair in enumerate(url_dir_pairs(self.urls, self.dirs)):
+                index %= self.workers
+                batches[index].append(pair)
+                now = time.monotonic()
+                if len(batches[index]) >= Config.URL_BATCH_SIZE or now - flushed[index] >= Config.CHANNEL_FLUSH_INTERVAL:
+                    self._put(queues[index], batches[index], processes[index])
+                    batches[index], flushed[index] = [], now
+        except BaseException as e:
+            self._feed_error = e
+        finally:
+            for pairs, batch, process in zip(queues, batches, processes):
+                try:
+                    if batch:
+                        self._put(pairs, batch, process)
+                    self._put(pairs, None, process)
+                except RuntimeError as e:
+                    self._feed_error = self._feed_error or e
+    
+    def run(self):
+        """Start the workers and render their events as one scan"""
+        lock = CheckpointStore.claim(self.args.checkpoint, self.args.resume)
+        try:
+            self._run()
+        finally:
+            lock.release()
+    
+    def _run(self):
+        events: multiprocessing.Queue = multiprocessing.Queue()
+        # Bounded, so a slow worker holds back reading instead of buffering the whole list
+        queues = [
+            multiprocessing.Queue(maxsize=max(1, Config.INPUT_BUFFER // Config.URL_BATCH_SIZE))
+            for _ in range(self.workers)
+        ]
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(pairs, worker_args(self.args, index, self.workers), events),
+                                    daemon=True)
+            for index, pairs in enumerate(queues)
+        ]
+        for process in processes:
+            process.start()
+        feeder = threading.Thread(target=self.feed, args=(queues, processes), daemon=True)
+        feeder.start()
+        
+        last_draw = 0.0
+        pending: List[Tuple] = []
+        while True:
+            try:
+                pending.extend(events.get(timeout=self.renderer.interval))
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and events.empty():
+                    break
+            now = time.monotonic()
+            if now - last_draw >= self.renderer.interval:
+                self.renderer.draw(pending)
+                pending, last_draw = [], now
+        self.renderer.draw(pending)
+        
+        for process in processes:
+            process.join()
+        feeder.join()
+        failed = [
+            f"worker {index} exited with code {process.exitcode}"
+            for index, process in enumerate(processes) if process.exitcode != 0
+        ]
+        if failed:
+            sys.exit("Scan failed: " + ", ".join(failed))
+        if self._feed_error is not None:
+            raise self._feed_error
+        if isinstance(self.urls, UrlStream):
+            self.renderer.stats.update(self.urls.stats())
+        self.renderer.print_summary()
+
+@dataclass
+class Lease:
+    """Requests handed to one remote worker, held until answered or no longer renewed"""
+    id: int
+    worker: str
+    deadline: float
+    ids: Set[int] = field(default_factory=set)
+
+class LeaseBroker:
+    """Requests waiting for remote workers, handed out in leased batches
+    
+    Each request waits on a future until a worker posts its result. Every
+    call from a worker renews its leases; leases not renewed within `ttl`
+    expire and their unanswered requests go back to the front of the
+    queue, so the work of a dead worker is picked up by the others. The
+    first result posted for a request wins.
+    """
+    
+    def __init__(self, ttl: float = Config.LEASE_TIMEOUT, poll: float = Config.LEASE_POLL):
+        self.ttl = ttl
+        self.poll = poll
+        self.closed = False
+        self.leased = 0
+        self.expired = 0
+        self.reassigned = 0
+        self.joined: Set[str] = set()
+        # Last contact of every worker still in the scan, and the final counters of those that left
+        self.workers: Dict[str, float] = {}
+        self.worker_stats: List[Dict] = []
+        self._next_id = 0
+        self._next_lease = 0
+        self._pending: deque = deque()
+        self._requests: Dict[int, Tuple[List, asyncio.Future]] = {}
+        self._leases: Dict[int, Lease] = {}
+        self._lease_of: Dict[int, int] = {}
+        self._available = asyncio.Event()
+    
+    async def submit(self, method: str, url: str, headers: Optional[Mapping[str, str]] = None,
+                     phase: str = "") -> RequestResult:
+        """Queue one request and wait for the result of whichever worker sends it"""
+        request_id, self._next_id = self._next_id, self._next_id + 1
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = ([request_id, method, url, dict(headers) if headers else None, phase], future)
+        self._pending.append(request_id)
+        self._available.set()
+        try:
+            return await future
+        finally:
+            del self._requests[request_id]
+            lease = self._leases.get(self._lease_of.pop(request_id, -1))
+            if lease:
+                lease.ids.discard(request_id)
+                if not lease.ids:
+                    del self._leases[lease.id]
+    
+    def _renew(self, worker: str):
+        now = time.monotonic()
+        self.joined.add(worker)
+        self.workers[worker] = now
+        for lease in self._leases.values():
+            if lease.worker == worker:
+                lease.deadline = now + self.ttl
+    
+    def _expire(self):
+        """Requeue the unanswered requests of leases that were not renewed in time"""
+        now = time.monotonic()
+        for lease_id, lease in list(self._leases.items()):
+            if lease.deadline > now:
+                continue
+            del self._leases[lease_id]
+            self.expired += 1
+            self.reassigned += len(lease.ids)
+            for request_id in lease.ids:
+                del self._lease_of[request_id]
+            # Oldest first, ahead of everything not leased yet
+            self._pending.extendleft(sorted(lease.ids, reverse=True))
+    
+    async def lease(self, worker: str, limit: int) -> Optional[List[List]]:
+        """Up to `limit` requests for `worker`, waiting up to `poll` seconds for some
+        
+        Returns None once the scan is over.
+        """
+        self._renew(worker)
+        deadline = time.monotonic() + self.poll
+        while True:
+            self._expire()
+            batch = []
+            while self._pending and len(batch) < limit:
+                request_id = self._pending.popleft()
+                # Requests answered or cancelled meanwhile are dropped
+                if request_id in self._requests:
+                    batch.append(request_id)
+            if batch:
+                lease_id, self._next_lease = self._next_lease, self._next_lease + 1
+                self._leases[lease_id] = Lease(lease_id, worker, time.monotonic() + self.ttl, set(batch))
+                for request_id in batch:
+                    self._lease_of[request_id] = lease_id
+                self.leased += len(batch)
+                return [self._requests[request_id][0] for request_id in batch]
+            remaining = deadline - time.monotonic()
+            if self.closed:
+                return None
+            if remaining <= 0:
+                return []
+            self._available.clear()
+            # Wake up now and then to expire the leases of other workers
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._available.wait(), min(remaining, 1.0))
+    
+    def complete(self, worker: str, results: List[List]) -> int:
+        """Resolve posted [request id, result] pairs; returns how many were still wanted"""
+        self._renew(worker)
+        accepted = 0
+        for request_id, data in results:
+            entry = self._requests.get(request_id)
+            if entry and not entry[1].done():
+                entry[1].set_result(RequestResult.from_wire(data))
+                accepted += 1
+        return accepted
+    
+    def leave(self, worker: str, stats: Dict):
+        """Record the final counters of a worker that finished"""
+        self.workers.pop(worker, None)
+        self.worker_stats.append(stats)
+    
+    async def drain(self):
+        """End the scan: stop polling workers and wait for the counters of the live ones"""
+        self.closed = True
+        self._available.set()
+        deadline = time.monotonic() + self.ttl
+        while time.monotonic() < deadline and any(
+            time.monotonic() - seen < self.ttl for seen in self.workers.values()
+        ):
+            await asyncio.sleep(0.1)
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "remote_workers": len(self.joined), "leased": self.leased,
+            "leases_expired": self.expired, "reassigned": self.reassigned
+        }
+
+class RemoteRequestManager(RequestManager):
+    """RequestManager of a coordinator: requests go through a LeaseBroker, not the network
+    
+    Scanners, pre-flight, checkpoints and output all run unchanged on the
+    coordinator; the global cap of the Scheduler bounds requests leased
+    out across the whole cluster. The session factory is only used to
+    know how the engine will write paths on the wire.
+    """
+    
+    def __init__(self, broker: LeaseBroker, session_factory: Optional[SessionFactory] = None,
+                 metrics: Optional[ScanMetrics] = None):
+        super().__init__(session_factory, metrics=metrics)
+        self.broker = broker
+    
+    async def __aenter__(self):
+        return self
+    
+    async def close(self):
+        pass
+    
+    async def make_request(self, method: str, url: str, headers: Optional[Mapping[str, str]] = None,
+                           phase: str = "", queued: Optional[float] = None) -> Optional[RequestResult]:
+        """Have one remote worker send the request (with its own retries) and return its result"""
+        if self.slots:
+            await self.slots.acquire()
+        if self.metrics:
+            self.metrics.in_flight += 1
+        try:
+            return await self.broker.submit(method, url, headers, phase)
+        finally:
+            if self.metrics:
+                self.metrics.in_flight -= 1
+            if self.slots:
+                self.slots.release()
+
+class Coordinator:
+    """HTTP front of a LeaseBroker for remote workers started with --join
+    
+    Every call must carry the scan token. Workers fetch the engine and
+    rate settings from /config, so only the coordinator needs the full
+    command line.
+    """
+    
+    # Arguments every worker takes over from the coordinator
+    SETTINGS = ("engine", "h2c", "per_host", "keepalive", "dns_ttl", "rate", "max_rate", "max_body")
+    
+    def __init__(self, broker: LeaseBroker, args: argparse.Namespace, port: int,
+                 host: str = Config.COORDINATOR_HOST):
+        self.broker = broker
+        self.settings = {name: getattr(args, name) for name in self.SETTINGS}
+        self.token = args.token
+        self.host = host
+        self.port = port
+        self._runner = None
+    
+    async def _payload(self, request) -> Dict:
+        if not secrets.compare_digest(request.headers.get("X-Bypass-Token", ""), self.token):
+            from aiohttp import web
+            raise web.HTTPForbidden(text="bad token")
+        return await request.json() if request.can_read_body else {}
+    
+    async def _config(self, request) -> "web.Response":
+        from aiohttp import web
+        await self._payload(request)
+        return web.json_response(self.settings)
+    
+    async def _lease(self, request) -> "web.Response":
+        from aiohttp import web
+        payload = await self._payload(request)
+        items = await self.broker.lease(payload["worker"], max(1, int(payload["max"])))
+        return web.json_response({"done": items is None, "items": items or []})
+    
+    async def _results(self, request) -> "web.Response":
+        from aiohttp import web
+        payload = await self._payload(request)
+        return web.json_response({"accepted": self.broker.complete(payload["worker"], payload["results"])})
+    
+    async def _leave(self, request) -> "web.Response":
+        from aiohttp import web
+        payload = await self._payload(request)
+        self.broker.leave(payload["worker"], payload["stats"])
+        return web.json_response({})
     
-    # Parse arguments
+    async def __aenter__(self):
+        from aiohttp import web
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/config", self._config)
+        app.router.add_post("/lease", self._lease)
+        app.router.add_post("/results", self._results)
+        app.router.add_post("/leave", self._leave)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._runner:
+            await self._runner.cleanup()
+
+class RemoteWorker:
+    """Worker side of distributed mode: pulls leased requests and streams their results back
+    
+    Leases are taken as the local Scheduler has room, so a worker holds
+    little more than its own concurrency. Results are posted in batches;
+    a worker with nothing to report still checks in every third of the
+    lease timeout, so slow requests do not lose their lease.
+    """
+    
+    def __init__(self, coordinator: str, token: str, batch_size: int,
+                 flush_interval: float = Config.CHANNEL_FLUSH_INTERVAL):
+        self.coordinator = coordinator.rstrip("/")
+        self.token = token
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.id = f"{socket.gethostname()}-{os.getpid()}-{secrets.token_hex(3)}"
+        self.completed = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Request id of every work item in flight, by object identity
+        self._ids: Dict[int, int] = {}
+        self._results: List[List] = []
+        self._last_call = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _call(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        """One call to the coordinator, retried with backoff while it cannot be reached"""
+        import aiohttp
+        for attempt in range(Config.MAX_RETRIES):
+            try:
+                self._last_call = time.monotonic()
+                async with self._session.request(
+                    method, self.coordinator + path, json=payload, headers={"X-Bypass-Token": self.token}
+                ) as response:
+                    response.raise_for_status()
+                    return await response.json()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == Config.MAX_RETRIES - 1:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+    
+    async def settings(self) -> Dict:
+        """Scan settings of the coordinator"""
+        return await self._call("GET", "/config")
+    
+    async def items(self) -> AsyncIterator[WorkItem]:
+        """Leased requests as work items, until the coordinator ends the scan"""
+        while True:
+            reply = await self._call("POST", "/lease", {"worker": self.id, "max": self.batch_size})
+            if reply["done"]:
+                return
+            for request_id, method, url, headers, phase in reply["items"]:
+                item = WorkItem(url, "", method, headers, phase)
+                self._ids[id(item)] = request_id
+                yield item
+    
+    async def handle_result(self, item: WorkItem, result: RequestResult):
+        self._results.append([self._ids.pop(id(item)), result.to_wire()])
+        self.completed += 1
+        if len(self._results) >= self.batch_size:
+            await self.flush()
+    
+    async def flush(self):
+        """Post the results gathered so far (an empty post just renews the leases)
+        
+        Results that could not be posted are put back in front of newer ones.
+        """
+        results, self._results = self._results, []
+        try:
+            await self._call("POST", "/results", {"worker": self.id, "results": results})
+        except BaseException:
+            self._results[:0] = results
+            raise
+    
+    async def _flush_periodically(self):
+        """Flush every interval, backing off while the coordinator cannot take results"""
+        import aiohttp
+        failures = 0
+        while True:
+            await asyncio.sleep(backoff_delay(failures - 1) if failures else self.flush_interval)
+            if self._results or time.monotonic() - self._last_call > Config.LEASE_TIMEOUT / 3:
+                try:
+                    await self.flush()
+                    failures = 0
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    failures += 1
+    
+    async def leave(self, stats: Dict):
+        """Post the last results and the final counters of this worker"""
+        await self.flush()
+        await self._call("POST", "/leave", {"worker": self.id, "stats": stats})
+    
+    async def __aenter__(self):
+        import aiohttp
+        # Lease calls may be held for a long poll
+        timeout = aiohttp.ClientTimeout(total=Config.LEASE_POLL + Config.TIMEOUT)
+        self._session = aiohttp.ClientSession(timeout=timeout)
+        self._task = asyncio.ensure_future(self._flush_periodically())
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._task:
+            self._task.cancel()
+        await self._session.close()
+
+async def run_remote_worker(args: argparse.Namespace) -> Tuple[RemoteWorker, Dict]:
+    """Send requests for the coordinator at `args.join` until its scan is over"""
+    async with RemoteWorker(args.join, args.token, args.threads) as worker:
+        args = argparse.Namespace(**dict(vars(args), **await worker.settings()))
+        # The coordinator's limits are per worker; local processes share them
+        share_host_limits(args, args.workers)
+        request_manager = build_request_manager(args)
+        async with contextlib.AsyncExitStack() as stack:
+            if args.metrics_port:
+                await stack.enter_async_context(
+                    MetricsServer(request_manager.metrics, request_manager, args.metrics_port)
+                )
+            await stack.enter_async_context(request_manager)
+            scheduler = Scheduler(request_manager, args.threads, args.per_host)
+            await scheduler.run(worker.items(), worker.handle_result)
+        stats = request_stats(request_manager)
+        await worker.leave(stats)
+    return worker, stats
+
+def join_scan(args: argparse.Namespace):
+    """Worker process entry point of distributed mode; prints its own counters at the end"""
+    import aiohttp
+    started = time.time()
+    try:
+        with profiled(args.profile):
+            worker, stats = asyncio.run(run_remote_worker(args))
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        sys.exit(f"Lost the coordinator at {args.join}: {e}")
+    renderer = Renderer(quiet=True)
+    renderer.handle("stats", stats)
+    renderer.display.print_remote_worker(worker.id, args.join, worker.completed, time.time() - started)
+    renderer.print_stats()
+
+async def main(urls: Iterable[str], dirs: List[str], args: argparse.Namespace):
+    """Scan in a single event loop, rendering from a separate task"""
+    renderer = Renderer(quiet=args.quiet)
+    render_task = asyncio.ensure_future(renderer.run())
+    try:
+        renderer.send("stats", await run_scan(urls, dirs, args, renderer))
+        if isinstance(urls, UrlStream):
+            renderer.send("stats", urls.stats())
+    finally:
+        renderer.close()
+        await render_task
+    renderer.print_summary()
+
+def run():
+    """Main entry point"""
+    # Parse arguments first so --help and usage errors stay instant
     parser = ArgumentParser()
-    urls, dirs = parser.parse()
+    urls, dirs, args = parser.parse()
+    Config.SUFFIX_LIST = args.suffix_list
     
-    # Process each URL and directory combination
-    tasks = []
-    for url in urls:
-        for dir in dirs:
-            scanner = Scanner(url, dir)
-            tasks.append(scanner.scan())
+    if not args.quiet:
+        DisplayManager().print_banner()
     
-    # Run all tasks concurrently
-    await asyncio.gather(*tasks)
+    if args.join and args.workers > 1:
+        # Each process joins as a worker of its own
+        processes = [
+            multiprocessing.Process(target=join_scan, args=(worker_args(args, index),))
+            for index in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        failed = [process for process in processes if process.exitcode]
+        if failed:
+            sys.exit("\n".join(f"Worker process {process.pid} exited with code {process.exitcode}"
+                               for process in failed))
+    elif args.join:
+        join_scan(args)
+    else:
+        try:
+            if args.workers > 1:
+                ShardedScan(urls, dirs, args).run()
+            else:
+                if args.coordinate:
+                    DisplayManager().print_coordinator(args.bind, args.coordinate, args.token)
+                with profiled(args.profile):
+                    asyncio.run(main(urls, dirs, args))
+        except CheckpointInUse as e:
+            sys.exit(str(e))
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run()
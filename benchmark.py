@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the 403 Bypass Tool
+Runs the scanner against a local mock target that emulates a 403-protected
+application and reports throughput, latency, memory and bypass recall.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import shlex
+import signal
+import socket
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+TOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "403bypasser_Naja.py")
+
+def load_tool():
+    """Import the scanner script as a module (its file name is not importable)"""
+    spec = importlib.util.spec_from_file_location("bypasser", TOOL_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["bypasser"] = module
+    spec.loader.exec_module(module)
+    return module
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class MockTarget:
+    """aiohttp application emulating a WAF-protected app
+    
+    Paths whose first segment starts with the protected prefix answer 403,
+    everything else answers a soft 404. Each enabled rule lets a mutation
+    through to the protected content:
+      xff       X-Forwarded-For set to an allowed address
+      encoded   an encoded dot ("%2e") or a ".json" suffix in the raw path
+      override  X-HTTP-Method-Override: PUT
+    """
+    
+    ALLOWED_IPS = {"127.0.0.1", "localhost"}
+    RULES = ("xff", "encoded", "override")
+    
+    def __init__(self, latency: float = 0.0, body_size: int = 512, rate_limit: float = 0.0,
+                 rules: tuple = RULES, protected: str = "admin"):
+        self.latency = latency
+        self.body_size = body_size
+        self.rate_limit = rate_limit
+        self.rules = set(rules)
+        self.protected = protected
+        self.stats: Dict[str, int] = {}
+        self._window: List[float] = []
+        self.reset()
+    
+    def reset(self):
+        self.stats = {"requests": 0, "bypasses": 0, "throttled": 0}
+        self._window = []
+    
+    def _body(self, text: str) -> str:
+        words = (text + " ") * (self.body_size // (len(text) + 1) + 1)
+        return words[:self.body_size]
+    
+    def _throttled(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        self._window = [t for t in self._window if t > now - 1]
+        self._window.append(now)
+        return len(self._window) > self.rate_limit
+    
+    def _bypassed(self, request: web.Request) -> bool:
+        raw = request.raw_path.lower()
+        if "xff" in self.rules and request.headers.get("X-Forwarded-For") in self.ALLOWED_IPS:
+            return True
+        if "encoded" in self.rules and ("%2e" in raw or raw.split("?")[0].endswith(".json")):
+            return True
+        if "override" in self.rules and request.headers.get("X-HTTP-Method-Override") == "PUT":
+            return True
+        return False
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        if request.path == "/__stats":
+            return web.json_response(self.stats)
+        if request.path == "/__reset":
+            self.reset()
+            return web.json_response(self.stats)
+        
+        self.stats["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+        if self._throttled():
+            self.stats["throttled"] += 1
+            return web.Response(status=429, headers={"Retry-After": "1"}, text="slow down")
+        
+        segments = [s for s in request.path.split("/") if s]
+        if not any(segment.startswith(self.protected) for segment in segments):
+            return web.Response(status=404, text=self._body("page not found"))
+        if self._bypassed(request):
+            self.stats["bypasses"] += 1
+            return web.Response(text=self._body(f"welcome to the admin panel {request.path}"))
+        return web.Response(status=403, text=self._body("forbidden by policy"))
+    
+    def serve(self, port: int):
+        """Run the target until the process is terminated"""
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        web.run_app(app, host="127.0.0.1", port=port, print=None, access_log=None)
+
+class Collector:
+    """Display channel that records results instead of drawing them"""
+    
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.requests = 0
+        self.errors = 0
+        self.reported_bypasses = 0
+        self.stats: Dict[str, int] = {}
+    
+    def send(self, kind: str, *payload):
+        if kind == "result":
+            result, interesting = payload
+            self.requests += 1
+            if result.error:
+                self.errors += 1
+                return
+            self.latencies.append(result.elapsed)
+            if interesting and result.status_code == 200:
+                self.reported_bypasses += 1
+        elif kind == "stats":
+            self.stats = payload[0]
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def fetch_json(port: int, path: str) -> Dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}") as response:
+        return json.loads(response.read())
+
+def run_case(port: int, threads: int, targets: int, tool_args: List[str], results: multiprocessing.Queue):
+    """Scan `targets` protected paths in a fresh process and report its metrics"""
+    tool = load_tool()
+    with tempfile.TemporaryDirectory() as workdir:
+        dirs_file = os.path.join(workdir, "dirs.txt")
+        with open(dirs_file, "w") as f:
+            f.writelines(f"/admin{i}\n" for i in range(targets))
+        argv = [
+            "-u", f"http://127.0.0.1:{port}", "-D", dirs_file, "-t", str(threads), "-q",
+            "--output-dir", workdir, "--checkpoint", os.path.join(workdir, "checkpoint"),
+            *tool_args
+        ]
+        urls, dirs, args = tool.ArgumentParser().parse(argv)
+        
+        collector = Collector()
+        started = time.perf_counter()
+        stats = asyncio.run(tool.run_scan(urls, dirs, args, collector))
+        duration = time.perf_counter() - started
+    
+    server = fetch_json(port, "/__stats")
+    created, reused = stats["created"], stats["reused"]
+    results.put({
+        "threads": threads,
+        "targets": targets,
+        "requests": collector.requests,
+        "errors": collector.errors,
+        "duration_s": round(duration, 3),
+        "requests_per_s": round(collector.requests / duration, 1) if duration else 0.0,
+        "latency_p50_ms": round(percentile(collector.latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(collector.latencies, 95) * 1000, 2),
+        "latency_p99_ms": round(percentile(collector.latencies, 99) * 1000, 2),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "server_requests": server["requests"],
+        "server_bypasses": server["bypasses"],
+        "server_throttled": server["throttled"],
+        "reported_bypasses": collector.reported_bypasses,
+        "bypass_recall": round(collector.reported_bypasses / server["bypasses"], 3) if server["bypasses"] else None,
+        "connection_reuse": round(reused / (created + reused), 3) if created + reused else 0.0,
+        "retries": stats["retries"]
+    })
+
+def wait_for(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            fetch_json(port, "/__stats")
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("mock target did not start")
+
+def wait_for_report(case: multiprocessing.Process, results: multiprocessing.Queue,
+                    timeout: float, poll: float = 1.0) -> Optional[Dict]:
+    """Report of a case process, or None if it exits without one or runs past `timeout`"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return results.get(timeout=poll)
+        except queue.Empty:
+            if not case.is_alive():
+                # The report may have been queued just before the process exited
+                try:
+                    return results.get(timeout=poll)
+                except queue.Empty:
+                    return None
+    case.terminate()
+    return None
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the 403 Bypass Tool against a local mock target")
+    parser.add_argument("--threads", type=int, nargs="+", default=[10, 50, 200],
+                        help="--threads values to benchmark (default: 10 50 200)")
+    parser.add_argument("--targets", type=int, nargs="+", default=[1, 10],
+                        help="Number of protected paths per run (default: 1 10)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Mean server latency in seconds (default: 0)")
+    parser.add_argument("--body-size", type=int, default=512,
+                        help="Response body size in bytes (default: 512)")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Server-wide requests per second before answering 429 (default: off)")
+    parser.add_argument("--rules", type=str, default=",".join(MockTarget.RULES),
+                        help=f"Comma separated bypass rules to enable (default: {','.join(MockTarget.RULES)})")
+    parser.add_argument("--tool-args", type=str, default="",
+                        help='Extra scanner arguments, ex: "--rate 1000 --combo 200"')
+    parser.add_argument("--output", type=str,
+                        help="Append one JSON object per run to this file")
+    parser.add_argument("--timeout", type=float, default=600.0,
+                        help="Seconds before a run is stopped and reported as failed (default: 600)")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    rules = tuple(rule for rule in args.rules.split(",") if rule)
+    target = MockTarget(args.latency, args.body_size, args.rate_limit, rules)
+    port = free_port()
+    server = multiprocessing.Process(target=target.serve, args=(port,), daemon=True)
+    server.start()
+    try:
+        wait_for(port)
+        print(f"{'threads':>7} {'targets':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'RSS MB':>7} {'recall':>7}")
+        failed = 0
+        for targets in args.targets:
+            for threads in args.threads:
+                fetch_json(port, "/__reset")
+                results: multiprocessing.Queue = multiprocessing.Queue()
+                case = multiprocessing.Process(
+                    target=run_case,
+                    args=(port, threads, targets, shlex.split(args.tool_args), results)
+                )
+                case.start()
+                report = wait_for_report(case, results, args.timeout)
+                case.join()
+                if report is None:
+                    failed += 1
+                    reason = "timed out" if case.exitcode == -signal.SIGTERM else f"exit code {case.exitcode}"
+                    report = {"threads": threads, "targets": targets, "failed": reason}
+                    print(f"{threads:>7} {targets:>7} failed: {reason}")
+                else:
+                    recall = "-" if report["bypass_recall"] is None else f"{report['bypass_recall']:.3f}"
+                    print(f"{threads:>7} {targets:>7} {report['requests_per_s']:>9.1f} "
+                          f"{report['latency_p50_ms']:>8.2f} {report['latency_p95_ms']:>8.2f} "
+                          f"{report['latency_p99_ms']:>8.2f} {report['peak_rss_mb']:>7.1f} {recall:>7}")
+                report.update(
+                    latency_s=args.latency, body_size=args.body_size,
+                    rate_limit=args.rate_limit, rules=list(rules),
+                    tool_args=args.tool_args, timestamp=time.time()
+                )
+                if args.output:
+                    with open(args.output, "a") as f:
+                        f.write(json.dumps(report) + "\n")
+    finally:
+        server.terminate()
+        server.join()
+    if failed:
+        sys.exit(f"{failed} run(s) failed")
+
+if __name__ == "__main__":
+    main()
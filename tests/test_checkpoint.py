@@ -0,0 +1,90 @@
+"""Resuming a scan from the checkpoint of an earlier run"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+
+class CountingManager:
+    """Request manager that answers 403 and remembers what it was asked for"""
+
+    def __init__(self):
+        self.slots = None
+        self.targets = []
+
+    async def make_request(self, method, target, headers, phase, queued):
+        self.targets.append(target)
+        return tool.RequestResult(method, target, 403, 9)
+
+
+def items(paths):
+    return [tool.WorkItem("http://target.test", path) for path in paths]
+
+
+async def scan(path: str, paths: list, resume: bool, run_id: str):
+    """Schedule `paths` with a checkpoint, returning the targets sent and the results seen"""
+    manager = CountingManager()
+    results = {}
+    async with tool.CheckpointStore(path, resume=resume, run_id=run_id) as store:
+
+        async def on_result(item, result):
+            results[item.path] = result
+            if not result.replayed:
+                store.record(item.key, result)
+
+        await tool.Scheduler(manager, concurrency=4, checkpoint=store).run(items(paths), on_result)
+    return sorted(manager.targets), results
+
+
+def test_resume_replays_finished_items(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    asyncio.run(scan(path, ["/admin", "/secret"], resume=False, run_id="a"))
+    sent, results = asyncio.run(scan(path, ["/admin", "/secret", "/backup"], resume=True, run_id="b"))
+
+    assert sent == ["http://target.test/backup"]
+    assert results["/admin"].replayed and results["/admin"].status_code == 403
+    assert results["/admin"].url == "http://target.test/admin"
+    assert not results["/backup"].replayed
+
+
+def test_fresh_run_clears_the_store(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    asyncio.run(scan(path, ["/admin"], resume=False, run_id="a"))
+    sent, _ = asyncio.run(scan(path, ["/admin"], resume=False, run_id="b"))
+    # Resuming after the fresh run finds only its own row
+    resumed, _ = asyncio.run(scan(path, ["/admin", "/secret"], resume=True, run_id="c"))
+
+    assert sent == ["http://target.test/admin"]
+    assert resumed == ["http://target.test/secret"]
+
+
+def test_rows_of_the_current_run_are_not_resumed(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    key = tool.WorkItem("http://target.test", "/admin").key
+
+    async def reopen(run_id):
+        async with tool.CheckpointStore(path, run_id="a") as store:
+            store.record(key, tool.RequestResult("GET", "http://target.test/admin", 403, 9))
+        async with tool.CheckpointStore(path, resume=True, run_id=run_id) as store:
+            return key in store
+
+    assert asyncio.run(reopen("b"))
+    assert not asyncio.run(reopen("a"))
+
+
+def test_store_in_use_is_not_claimed(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    lock = tool.CheckpointStore.claim(path, resume=False)
+    try:
+        with pytest.raises(tool.CheckpointInUse):
+            tool.CheckpointStore.claim(path, resume=True)
+    finally:
+        lock.release()
+    tool.CheckpointStore.claim(path, resume=True).release()
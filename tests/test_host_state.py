@@ -0,0 +1,77 @@
+"""Per-host state stays bounded however many hosts a scan visits"""
+
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+LIMIT = 64
+
+
+class ForbiddenManager:
+    """Request manager that answers 404 to every probe, through a real rate controller"""
+
+    def __init__(self):
+        self.slots = None
+        self.rate_controller = tool.HostRateController(max_hosts=LIMIT)
+
+    async def make_request(self, method, target, headers, phase, queued):
+        host = tool.host_of(target)
+        await self.rate_controller.acquire(host)
+        self.rate_controller.observe(host, 0.001, 404)
+        return tool.RequestResult(method, target, 404, 0)
+
+
+async def reachable(url):
+    return True
+
+
+async def preflight_hosts(count: int):
+    """Probe one path on `count` hosts and return what is left alive afterwards"""
+    manager = ForbiddenManager()
+    scheduler = tool.Scheduler(manager, concurrency=20)
+    pairs = ((f"http://host{index}.test", "/admin") for index in range(count))
+    preflight = tool.Preflight(pairs, lambda *args: None, concurrency=20)
+    preflight._connect = reachable
+    await scheduler.run(preflight.items())
+    assert preflight.skipped[404] == count
+    return manager, scheduler, preflight
+
+
+def retained_bytes(count: int) -> int:
+    tracemalloc.start()
+    try:
+        state = asyncio.run(preflight_hosts(count))
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del state
+    return size
+
+
+def test_host_state_is_bounded(monkeypatch):
+    monkeypatch.setattr(tool.Config, "HOST_STATE_LIMIT", LIMIT)
+    manager, scheduler, preflight = asyncio.run(preflight_hosts(1000))
+
+    assert not scheduler._host_slots
+    assert not scheduler._host_users
+    assert not preflight._checks
+    assert len(preflight._verdicts) == LIMIT
+    assert len(manager.rate_controller._hosts) == LIMIT
+
+
+def test_memory_stays_flat_as_hosts_grow(monkeypatch):
+    monkeypatch.setattr(tool.Config, "HOST_STATE_LIMIT", LIMIT)
+    # Both runs are past every bounded cache (the host caches hold 4096 entries)
+    small = retained_bytes(5000)
+    large = retained_bytes(15000)
+
+    # Unbounded per-host state costs over a kilobyte per extra host
+    assert large - small < 200 * 1024
@@ -0,0 +1,90 @@
+"""Leases of remote workers expiring and their requests going to other workers"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+TTL = 0.05
+
+
+def answer(request):
+    request_id, method, url, headers, phase = request
+    return [request_id, tool.RequestResult(method, url, 403, 9).to_wire()]
+
+
+async def submit_all(broker, paths):
+    tasks = [asyncio.ensure_future(broker.submit("GET", f"http://target.test{path}")) for path in paths]
+    await asyncio.sleep(0)
+    return tasks
+
+
+def test_expired_lease_is_reassigned_oldest_first():
+    async def scenario():
+        broker = tool.LeaseBroker(ttl=TTL, poll=0.01)
+        tasks = await submit_all(broker, ["/a", "/b", "/c"])
+        dead = await broker.lease("dead", 2)
+        await asyncio.sleep(TTL * 2)
+
+        first = await broker.lease("live", 2)
+        second = await broker.lease("live", 2)
+        accepted = broker.complete("live", [answer(request) for request in first + second])
+        results = await asyncio.gather(*tasks)
+        late = broker.complete("dead", [answer(request) for request in dead])
+        return dead, first, second, accepted, results, late, broker.stats()
+
+    dead, first, second, accepted, results, late, stats = asyncio.run(scenario())
+
+    assert [request[0] for request in dead] == [0, 1]
+    # The expired requests go out again ahead of the one never leased
+    assert [request[0] for request in first] == [0, 1]
+    assert [request[0] for request in second] == [2]
+    assert accepted == 3
+    assert [result.url for result in results] == [f"http://target.test{path}" for path in ("/a", "/b", "/c")]
+    assert late == 0
+    assert stats == {"remote_workers": 2, "leased": 5, "leases_expired": 1, "reassigned": 2}
+
+
+def test_renewed_lease_does_not_expire():
+    async def scenario():
+        # Four polls a lease apart outlive the lease only if they fail to renew it
+        broker = tool.LeaseBroker(ttl=TTL * 4, poll=0.01)
+        tasks = await submit_all(broker, ["/a"])
+        leased = await broker.lease("slow", 1)
+        for _ in range(4):
+            await asyncio.sleep(TTL * 2)
+            # Polling for more work renews the worker's leases
+            assert await broker.lease("slow", 1) == []
+        other = await broker.lease("other", 1)
+        accepted = broker.complete("slow", [answer(request) for request in leased])
+        await asyncio.gather(*tasks)
+        return other, accepted, broker.stats()
+
+    other, accepted, stats = asyncio.run(scenario())
+
+    assert other == []
+    assert accepted == 1
+    assert stats["leases_expired"] == 0
+
+
+def test_first_result_wins_after_reassignment():
+    async def scenario():
+        broker = tool.LeaseBroker(ttl=TTL, poll=0.01)
+        tasks = await submit_all(broker, ["/a"])
+        late = await broker.lease("late", 1)
+        await asyncio.sleep(TTL * 2)
+        again = await broker.lease("live", 1)
+        # The original worker answers after its lease expired but before the new one does
+        first = broker.complete("late", [answer(request) for request in late])
+        await asyncio.gather(*tasks)
+        second = broker.complete("live", [answer(request) for request in again])
+        return again, first, second
+
+    again, first, second = asyncio.run(scenario())
+
+    assert [request[0] for request in again] == [0]
+    assert (first, second) == (1, 0)
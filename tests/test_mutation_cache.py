@@ -0,0 +1,29 @@
+"""Memory held by the process-wide mutation cache"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+
+def test_header_memo_does_not_grow_with_base_paths():
+    cache = tool.MutationCache()
+    cache.get("/admin")
+    shared = len(cache._headers)
+
+    for index in range(200):
+        mutations = cache.get(f"/admin{index}")
+        assert {"X-Original-URL": f"/admin{index}"} in [dict(header) for _, header in mutations.headers]
+
+    assert len(cache._headers) == shared
+
+
+def test_path_independent_headers_are_shared():
+    cache = tool.MutationCache()
+    first, second = cache.get("/admin"), cache.get("/secret")
+
+    assert all(mine is theirs for mine, theirs in zip(first.method_headers, second.method_headers))
+    assert first.headers[0] is second.headers[0]
@@ -0,0 +1,54 @@
+"""Counts the path generator reports against what it actually yields"""
+
+import itertools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+BASE_PATHS = [
+    "", "/", "/a", "/admin", "/admin/", "/.", "/..", "/.;/admin", "/a?", "/a#",
+    "/api/v1/users", "a/",
+    # A '%' lets encoded variants collide with each other and with structural ones
+    "/a%20", "/%2e", "/%2e/a", "/a%20%20", "/%25", "/a%2e%2e",
+]
+
+
+def assert_exact(generator):
+    paths = [path for _, path in generator.iter_variants()]
+
+    assert len(paths) == len(set(paths))
+    assert generator.path_count == len(paths)
+
+
+@pytest.mark.parametrize("base_path", BASE_PATHS)
+def test_path_count_is_exact(base_path):
+    assert_exact(tool.PathGenerator(base_path))
+
+
+def test_path_count_is_exact_for_short_paths():
+    # Every path of up to three characters the structural patterns are made of
+    for chars in itertools.product("/.?#;a%2e", repeat=3):
+        assert_exact(tool.PathGenerator("/" + "".join(chars)))
+
+
+@pytest.mark.parametrize("base_path", ["/admin", "/a%20"])
+def test_header_counts_are_exact(base_path):
+    generator = tool.PathGenerator(base_path)
+
+    assert generator.header_count == len(list(generator.iter_headers()))
+    assert generator.method_header_count == len(list(generator.iter_method_headers()))
+
+
+def test_mutation_set_counts_match_generator():
+    generator = tool.PathGenerator("/admin")
+    eager = tool.MutationSet(generator, tool.MUTATIONS.freeze)
+    lazy = tool.MutationSet(generator, tool.MUTATIONS.freeze, materialize=False)
+
+    assert eager.path_count == lazy.path_count == generator.path_count
+    assert list(eager.iter_variants()) == list(lazy.iter_variants())
@@ -0,0 +1,59 @@
+"""Requests the pre-flight stage hands over to the full scan"""
+
+import asyncio
+import os
+import sys
+from collections import Counter
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+
+async def scan_counting_requests(workdir: str, dirs: list) -> Counter:
+    """Scan `dirs` on a local server that answers 403 and count the request lines it gets"""
+    lines: Counter = Counter()
+
+    async def handle(request: web.Request) -> web.Response:
+        headers = tuple(sorted((name, value) for name, value in request.headers.items()
+                               if name.lower().startswith("x-")))
+        lines[(request.method, request.raw_path, headers)] += 1
+        return web.Response(status=403, text="forbidden")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = benchmark.free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    try:
+        dirs_file = os.path.join(workdir, "dirs.txt")
+        with open(dirs_file, "w") as f:
+            f.writelines(f"{path}\n" for path in dirs)
+        urls, dirs, args = tool.ArgumentParser().parse([
+            "-u", f"http://127.0.0.1:{port}", "-D", dirs_file, "-q",
+            "--output-dir", workdir, "--checkpoint", os.path.join(workdir, "checkpoint"),
+        ])
+        await tool.run_scan(urls, dirs, args, benchmark.Collector())
+    finally:
+        await runner.cleanup()
+    return lines
+
+
+def test_preflight_path_is_not_sent_again(tmp_path):
+    lines = asyncio.run(scan_counting_requests(str(tmp_path), ["/admin", "/secret"]))
+
+    assert lines[("GET", "/admin", ())] == 1
+    assert lines[("GET", "/secret", ())] == 1
+    assert [line for line, count in lines.items() if count > 1] == []
+
+
+def test_paths_normalizing_alike_share_requests(tmp_path):
+    # aiohttp sends /%2e%2e/admin as /admin, so only the pre-flight request repeats
+    lines = asyncio.run(scan_counting_requests(str(tmp_path), ["/admin", "/%2e%2e/admin"]))
+
+    assert [line for line, count in lines.items() if count > 1] == [("GET", "/admin", ())]
+    assert lines[("GET", "/admin", ())] == 2
@@ -0,0 +1,96 @@
+"""Response parsing and connection reuse of the raw HTTP/1.1 engine"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+
+async def exchange(responses: list, targets: list) -> tuple:
+    """Send GETs for `targets` on the raw engine to a server writing `responses` in turn
+
+    Returns the bodies read (or the TransportError raised), the request
+    lines the server got, the number of connections it accepted, and the
+    factory with its pool counters.
+    """
+    lines, connections = [], []
+    replies = list(responses)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connections.append(writer)
+        while replies:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+            lines.append(head.split(b"\r\n", 1)[0].decode())
+            reply = replies.pop(0)
+            writer.write(reply)
+            await writer.drain()
+            if b"Connection: close" in reply:
+                break
+        # Closing after the last reply also cuts a truncated body short
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    factory = tool.RawSessionFactory()
+    session = factory.acquire()
+    bodies = []
+    try:
+        for target in targets:
+            try:
+                async with session.request("GET", f"http://127.0.0.1:{port}{target}", timeout=5) as response:
+                    bodies.append(b"".join([chunk async for chunk in response.content.iter_chunked(4)]))
+            except tool.TransportError as e:
+                bodies.append(e)
+    finally:
+        await factory.release()
+        server.close()
+        await server.wait_closed()
+    return bodies, lines, len(connections), factory
+
+
+def test_chunked_body_is_decoded():
+    reply = (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+             b"5\r\nhello\r\n6;name=value\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\n")
+    bodies, _, _, _ = asyncio.run(exchange([reply], ["/admin"]))
+
+    assert bodies == [b"hello world"]
+
+
+def test_truncated_chunk_raises_transport_error():
+    reply = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n10\r\nonly part"
+    bodies, _, _, _ = asyncio.run(exchange([reply], ["/admin"]))
+
+    assert isinstance(bodies[0], tool.TransportError)
+
+
+@pytest.mark.parametrize("reply", [
+    b"HTTP/1.1 403 Forbidden\r\nContent-Length: 9\r\n\r\nforbidden",
+    b"HTTP/1.1 403 Forbidden\r\nTransfer-Encoding: chunked\r\n\r\n9\r\nforbidden\r\n0\r\n\r\n",
+])
+def test_keep_alive_connection_is_reused(reply):
+    targets = ["/admin", "/%2e%2e/admin", "/admin?"]
+    bodies, lines, connections, factory = asyncio.run(exchange([reply] * 3, targets))
+
+    assert bodies == [b"forbidden"] * 3
+    # Targets go out byte for byte, all on the first connection
+    assert lines == [f"GET {target} HTTP/1.1" for target in targets]
+    assert connections == 1
+    assert (factory.connections_created, factory.connections_reused) == (1, 2)
+
+
+def test_connection_close_is_not_pooled():
+    reply = b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+    bodies, _, connections, factory = asyncio.run(exchange([reply] * 2, ["/a", "/b"]))
+
+    assert bodies == [b"", b""]
+    assert connections == 2
+    assert factory.connections_reused == 0
@@ -0,0 +1,61 @@
+"""Normalization and deduplication of target URLs"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import benchmark
+
+tool = benchmark.load_tool()
+
+
+@pytest.mark.parametrize("line, url", [
+    ("example.com", "http://example.com"),
+    ("  HTTP://Example.COM/  \n", "http://example.com"),
+    ("http://example.com:80/admin/", "http://example.com/admin"),
+    ("https://example.com:443", "https://example.com"),
+    ("https://example.com:8443/a?b=1#frag", "https://example.com:8443/a?b=1"),
+    ("http://user:pw@Example.com/", "http://user:pw@example.com"),
+    ("http://[::1]:8080/x", "http://[::1]:8080/x"),
+])
+def test_normalize_url(line, url):
+    assert tool.normalize_url(line) == url
+
+
+@pytest.mark.parametrize("line", [
+    "", "   ", "# comment", "ftp://example.com", "http://", "http://exa mple.com", "http://example.com:99999",
+])
+def test_normalize_url_rejects(line):
+    assert tool.normalize_url(line) is None
+
+
+def test_url_stream_dedups_spelling_variants():
+    stream = tool.UrlStream(["example.com", "HTTP://example.com:80/", "# skip", "not a url at all", "example.org"])
+
+    assert list(stream) == ["http://example.com", "http://example.org"]
+    assert (stream.read, stream.duplicates, stream.invalid) == (3, 1, 1)
+
+
+def test_bloom_filter_has_no_false_negatives_as_it_grows():
+    seen = tool.ScalableBloomFilter(capacity=100, error_rate=1e-9)
+    items = [f"http://host{index}.test" for index in range(5000)]
+
+    assert all(seen.add(item) for item in items)
+    assert len(seen.filters) > 1
+    assert all(item in seen for item in items)
+    assert not any(seen.add(item) for item in items)
+
+
+def test_bloom_filter_false_positive_rate_stays_bounded():
+    seen = tool.ScalableBloomFilter(capacity=1000, error_rate=1e-3)
+    for index in range(20000):
+        seen.add(f"in-{index}")
+
+    rng = random.Random(1)
+    probes = [f"out-{rng.getrandbits(64)}" for _ in range(20000)]
+    false_positives = sum(probe in seen for probe in probes)
+    # The compound bound is error_rate; allow sampling noise on top
+    assert false_positives <= 20000 * 1e-3 * 2